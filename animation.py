@@ -1,24 +1,24 @@
-import pymel.core as pm
+import maya.cmds as cmds
+import maya.mel as mel
 
 FPS_TO_STRING = {
     30: "ntsc",
     60: "ntscf",
 }
 
-STRING_TO_FPS = {
-    "ntsc": 30,
-    "ntscf": 60
-}
+STRING_TO_FPS = {string: fps for fps, string in FPS_TO_STRING.items()}
+
+BOOKMARK_ATTRIBUTES = ("name", "timeRangeStart", "timeRangeStop", "colorR", "colorG", "colorB", "exportable", "clip_type")
 
 
 def get_time_range():
     """
-    Returns begin and end frame
+    Returns begin and end frame. These are floats, so sub-frame ranges don't get truncated
 
-    :return: *list*
+    :return: *tuple*
     """
-    start_time = int(pm.playbackOptions(q=True, min=True))
-    end_time = int(pm.playbackOptions(q=True, max=True))
+    start_time = cmds.playbackOptions(q=True, min=True)
+    end_time = cmds.playbackOptions(q=True, max=True)
     return start_time, end_time
 
 
@@ -30,7 +30,7 @@ def set_time_range(start, end):
     :param end: *int* end time
     :return: None
     """
-    pm.playbackOptions(minTime=start, maxTime=end, animationStartTime=start, animationEndTime=end)
+    cmds.playbackOptions(minTime=start, maxTime=end, animationStartTime=start, animationEndTime=end)
 
 def get_selected_time_range():
     """
@@ -38,9 +38,9 @@ def get_selected_time_range():
 
     :return: *list* The currently active/selected timerange
     """
-    playbackslider = pm.melGlobals["gPlayBackSlider"]
+    playbackslider = mel.eval("$tmp = $gPlayBackSlider")
 
-    sel_time_range = pm.timeControl(playbackslider, q=True, rangeArray=True)
+    sel_time_range = cmds.timeControl(playbackslider, q=True, rangeArray=True)
     sel_time_range[-1] = sel_time_range[-1] - 1
 
     if sel_time_range[1] - sel_time_range[0] == 0:
@@ -50,14 +50,15 @@ def get_selected_time_range():
 
 def get_time_bookmarks_data():
     all_bookmark_data = {}
-    for node in pm.ls(type="timeSliderBookmark"):
+    for node in cmds.ls(type="timeSliderBookmark"):
         bookmark_data = {}
+        existing_attrs = set(cmds.listAttr(node) or [])
 
-        for interesting_attr in ["name", "timeRangeStart", "timeRangeStop", "colorR", "colorG", "colorB", "exportable", "clip_type"]:
-            if node.hasAttr(interesting_attr):
-                bookmark_data[interesting_attr] = node.getAttr(interesting_attr)
+        for interesting_attr in BOOKMARK_ATTRIBUTES:
+            if interesting_attr in existing_attrs:
+                bookmark_data[interesting_attr] = cmds.getAttr("%s.%s" % (node, interesting_attr))
 
-        all_bookmark_data[node.name()] = bookmark_data
+        all_bookmark_data[node] = bookmark_data
 
     return all_bookmark_data
 
@@ -67,12 +68,18 @@ def get_fps():
 
     :return: *float*
     """
-    return STRING_TO_FPS.get(pm.currentUnit(query=True, time=True))
+    return STRING_TO_FPS.get(cmds.currentUnit(query=True, time=True))
 
 def set_fps(fps_number):
     """
     Set the current FPS
 
-    :return: *float*
+    :param fps_number: *int* one of the keys of FPS_TO_STRING
+    :return: None
     """
-    pm.currentUnit(time=FPS_TO_STRING.get(fps_number))
+    try:
+        time_unit = FPS_TO_STRING[fps_number]
+    except KeyError:
+        raise ValueError("%s is not a supported FPS, valid options are: %s" % (fps_number, sorted(FPS_TO_STRING)))
+
+    cmds.currentUnit(time=time_unit)
@@ -1,16 +1,29 @@
+import re
+
+import numpy as np
+
 import pymel.core as pm
-from . import general
-from . import rigging
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+from . import decorators
 
-def get_blend_shape_nodes(source_object):
+def get_blend_shape_nodes(source_object, as_strings=False):
     """
     Convenience one-liner to get the blendShape nodes on an object
 
+    Only the deformer history is walked (traversal stops at dag nodes, so joints and target meshes are never visited)
+    and only the blendShape nodes get turned into PyNodes
+
     :param source_object: *string* or *PyNode* of the object you want to get blendShape nodes from
+    :param as_strings: *bool* return the node names instead of PyNodes
     :return: *list* of blendShape nodes
     """
-    source_object = pm.PyNode(source_object)
-    return source_object.listHistory(type="blendShape")
+    history = cmds.listHistory(str(source_object), pruneDagObjects=True) or []
+    blend_shape_nodes = cmds.ls(history, type="blendShape")
+
+    if as_strings:
+        return blend_shape_nodes
+    return [pm.PyNode(node) for node in blend_shape_nodes]
 
 def set_blend_shape_value(blend_shape_node, blend_shape_name, value, reset=True):
     """
@@ -23,15 +36,18 @@ def set_blend_shape_value(blend_shape_node, blend_shape_name, value, reset=True)
     :return:
     """
     blend_shape_node = pm.PyNode(blend_shape_node)
-    value = float(value)
-    all_weights = get_blend_shape_target_names(blend_shape_node)
+    weight_indices = get_blend_shape_weight_indices(blend_shape_node)
 
-    for weight_name in all_weights:
-        if weight_name == blend_shape_name:
-            blend_shape_node.attr(blend_shape_name).set(value)
-        else:
-            if reset:
-                blend_shape_node.attr(weight_name).set(0)
+    weights = {}
+    if reset:
+        # reading all the weights is one call, so only write the ones that aren't 0 yet. Usually that's just the
+        # weight that was active before
+        current_weights = _get_weights(blend_shape_node)
+        weights = {index: 0.0 for index in weight_indices.values() if current_weights.get(index, 0.0) != 0.0}
+    if blend_shape_name in weight_indices:
+        weights[weight_indices[blend_shape_name]] = float(value)
+
+    _set_weights(blend_shape_node, weights)
 
 def turn_off_all_blend_shapes(blend_shape_node):
     """
@@ -41,13 +57,143 @@ def turn_off_all_blend_shapes(blend_shape_node):
     :return: *list* with the names of all the blendShape weights on this node
     """
     blend_shape_node = pm.PyNode(blend_shape_node)
-    all_weights = get_blend_shape_target_names(blend_shape_node)
+    weight_indices = get_blend_shape_weight_indices(blend_shape_node)
+    all_weights = sorted(weight_indices, key=weight_indices.get)
+
+    current_weights = _get_weights(blend_shape_node)
 
-    for weight_name in all_weights:
-        blend_shape_node.attr(weight_name).set(0)
+    _set_weights(blend_shape_node, {index: 0.0 for index in weight_indices.values()
+                                    if current_weights.get(index, 0.0) != 0.0})
 
     return all_weights
 
+def get_blend_shape_weight_indices(blend_shape_node):
+    """
+    Maps the names of the blendShape weights to their index in the weight multi attribute, using a single
+    aliasAttr query instead of going over every weight plug
+
+    :param blend_shape_node: *string* or *PyNode* of the blendShape node
+    :return: *dict* with the weight names as keys and the weight indices as values
+    """
+    aliases = cmds.aliasAttr(str(blend_shape_node), query=True) or []
+
+    weight_indices = {}
+    for alias, plug in zip(aliases[::2], aliases[1::2]):
+        match = re.match(r"(?:weight|w)\[([0-9]+)\]$", plug)
+        if match:
+            weight_indices[alias] = int(match.group(1))
+
+    return weight_indices
+
+def _get_weights(blend_shape_node):
+    """
+    Reads all the blendShape weights at once
+
+    :param blend_shape_node: *string* or *PyNode* of the blendShape node
+    :return: *dict* with the weight indices as keys and the current weight values as values
+    """
+    weight_attr = "%s.weight" % blend_shape_node
+    indices = cmds.getAttr(weight_attr, multiIndices=True)
+    if not indices:
+        return {}
+
+    values = cmds.getAttr(weight_attr)
+    if isinstance(values, list) and values and isinstance(values[0], tuple):
+        values = values[0]
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+
+    return dict(zip(indices, values))
+
+def _set_weights(blend_shape_node, weights):
+    """
+    Writes blendShape weights with one setAttr call per run of consecutive indices, rather than one call per weight
+
+    :param blend_shape_node: *string* or *PyNode* of the blendShape node
+    :param weights: *dict* with weight indices as keys and the values you want to set as values
+    :return: None
+    """
+    indices = sorted(weights)
+    run_start = 0
+
+    for position in range(1, len(indices) + 1):
+        if position < len(indices) and indices[position] == indices[position - 1] + 1:
+            continue
+
+        run = indices[run_start:position]
+        values = [weights[index] for index in run]
+        cmds.setAttr("%s.weight[%d:%d]" % (blend_shape_node, run[0], run[-1]), *values, size=len(values))
+        run_start = position
+
+def each_blend_shape_target(blend_shape_node):
+    """
+    Turns on every target of the blendShape node in turn, with all the other weights at 0, and yields its name. Only
+    the weight that was on before and the one that is turned on get written for every target. The weights the node
+    had before are put back when it's done.
+
+    Example use:
+
+    for target_name in each_blend_shape_target(blend_shape_node):
+        positions[target_name] = get_vertex_pos_of_mesh(mesh)
+
+    :param blend_shape_node: *string* or *PyNode* of the blendShape node
+    :return: generator of the target names, in weight index order
+    """
+    weight_indices = get_blend_shape_weight_indices(blend_shape_node)
+    original_weights = _get_weights(blend_shape_node)
+
+    _set_weights(blend_shape_node, {index: 0.0 for index, value in original_weights.items() if value != 0.0})
+    try:
+        previous_index = None
+        for target_name in sorted(weight_indices, key=weight_indices.get):
+            weights = {weight_indices[target_name]: 1.0}
+            if previous_index is not None and previous_index not in weights:
+                weights[previous_index] = 0.0
+            _set_weights(blend_shape_node, weights)
+            previous_index = weight_indices[target_name]
+
+            yield target_name
+    finally:
+        _set_weights(blend_shape_node, original_weights)
+
+def set_target_deltas(blend_shape_node, index, target_name, deltas, geometry_index=0):
+    """
+    Makes (or overwrites) a blendShape target straight from the per vertex offsets, without needing a target mesh in
+    the scene. The weight of the target is set to 0 and gets target_name as its alias.
+
+    :param blend_shape_node: *string* or *PyNode* of the blendShape node
+    :param index: *int* weight index of the target
+    :param target_name: *string* name of the target
+    :param deltas: (number of vertices, 3) *list* or *numpy.ndarray* with the offset of every vertex of the base mesh
+    :param geometry_index: *int* index of the deformed geometry on the blendShape node
+    :return: None
+    """
+    node_name = str(blend_shape_node)
+    points = [(x, y, z, 1.0) for x, y, z in np.asarray(deltas, dtype=np.float64).reshape(-1, 3).tolist()]
+
+    # the components get written straight onto the node, nothing else checks that the offsets fit the base mesh
+    geometry_by_index = dict(zip(cmds.deformer(node_name, query=True, geometryIndices=True) or [],
+                                 cmds.deformer(node_name, query=True, geometry=True) or []))
+    base_geometry = geometry_by_index.get(geometry_index)
+    if base_geometry is None:
+        raise ValueError("%s has no geometry at index %s" % (node_name, geometry_index))
+    number_of_vertices = cmds.polyEvaluate(base_geometry, vertex=True)
+    if len(points) != number_of_vertices:
+        raise ValueError("%s has %s offsets, but %s has %s vertices"
+                         % (target_name, len(points), base_geometry, number_of_vertices))
+
+    # 6000 is the item index of a target at full weight
+    item_attr = "%s.inputTarget[%d].inputTargetGroup[%d].inputTargetItem[6000]" % (node_name, geometry_index, index)
+    cmds.setAttr(item_attr + ".inputPointsTarget", len(points), *points, type="pointArray")
+    if points:
+        cmds.setAttr(item_attr + ".inputComponentsTarget", 1, "vtx[0:%d]" % (len(points) - 1), type="componentList")
+    else:
+        cmds.setAttr(item_attr + ".inputComponentsTarget", 0, type="componentList")
+
+    weight_attr = "%s.weight[%d]" % (node_name, index)
+    cmds.setAttr(weight_attr, 0.0)
+    cmds.aliasAttr(target_name, weight_attr)
+
 def extract_blend_shapes(blend_shape_node):
     """
     Extract the blend shape targets as separate meshes in the scene
@@ -77,21 +223,29 @@ def get_blend_shape_target_names(blend_shape_node):
     pm.listAttr("%s.weight" % blend_shape_node.name(), multi=True) when they could auto complete
     to get_blend_shape_target_names?
 
+    Uses a single aliasAttr query rather than asking every weight plug for its alias.
+
     :param blend_shape_node: *string* or *PyNode* of the blendShape node
-    :return: *list* with the names of all the targets on this blendshape
+    :return: *list* with the names of all the targets on this blendshape, in weight index order
     """
-    blend_shape_node = pm.PyNode(blend_shape_node)
-    return [weight.getAlias() for weight in blend_shape_node.w]
+    weight_indices = get_blend_shape_weight_indices(blend_shape_node)
+    return sorted(weight_indices, key=weight_indices.get)
 
-def transfer_blend_shapes(source, target, specific_blend_shape_nodes=None):
+def transfer_blend_shapes(source, target, specific_blend_shape_nodes=None, skip_empty_targets=False,
+                          tolerance=1e-6):
     """
     Transfers the blend shapes from one mesh to another.
 
     :param source: *string* or *PyNode* of the source object
     :param target: *string* or *PyNode* of the target object
     :param specific_blend_shape_nodes: *list* if you only want to use specific nodes to transfer
+    :param skip_empty_targets: *bool* if True, targets that don't move any vertex on the target mesh are left out
+    :param tolerance: *float* distance a vertex has to move for a target to not count as empty
     :return: *list* with all the newly (is that a word...? it looks weird) created blendShape nodes
     """
+    from . import general
+    from . import rigging
+
     source = pm.PyNode(source)
     target = pm.PyNode(target)
     copied_meshes = []
@@ -106,33 +260,83 @@ def transfer_blend_shapes(source, target, specific_blend_shape_nodes=None):
             else:
                 blend_shape_nodes = [pm.PyNode(node) for node in specific_blend_shape_nodes]
 
-        wrap_node = rigging.create_wrap(source.name(long=False), target.name(long=False))
+        source_name = source.name(long=False)
+        wrap_base_name = "%sBase" % source_name
+
+        # the wrap and the throwaway target meshes are deleted again before we return, so there's no need to fill up
+        # the undo queue with making them. The weight changes on the source and deleting the meshes are recorded, so
+        # undoing puts everything back the way it was
+        target_copies = []
+        with decorators.UndoDisabled():
+            wrap_node = rigging.create_wrap(source_name, target.name(long=False))
+        try:
+            # the targets only differ from the wrapped mesh in their point positions, so grab the topology once
+            # and build every target from that instead of duplicating the whole mesh for each one of them
+            selection_list = om.MSelectionList()
+            selection_list.add(target.getShape().fullPath())
+            target_fn_mesh = om.MFnMesh(selection_list.getDagPath(0))
+            polygon_counts, polygon_connects = target_fn_mesh.getVertices()
+
+            for bs_node in blend_shape_nodes:
+                copies = []
+                target_copies.append((bs_node, copies))
+
+                # the weights the user dialled in get put back when all the targets are copied
+                original_weights = _get_weights(bs_node)
+                try:
+                    # start with every weight at 0, after that only the previous and the current target need to change
+                    weight_indices = get_blend_shape_weight_indices(bs_node)
+                    _set_weights(bs_node, dict.fromkeys(weight_indices.values(), 0.0))
+                    active_index = None
+                    if skip_empty_targets:
+                        base_points = np.array(target_fn_mesh.getPoints(om.MSpace.kObject))[:, :3]
+
+                    for index, target_name in enumerate(sorted(weight_indices, key=weight_indices.get)):
+                        changed_weights = {}
+                        if active_index is not None:
+                            changed_weights[active_index] = 0.0
+                        active_index = weight_indices.get(target_name)
+                        if active_index is not None:
+                            changed_weights[active_index] = 1.0
+                        _set_weights(bs_node, changed_weights)
+
+                        target_points = target_fn_mesh.getPoints(om.MSpace.kObject)
+                        if skip_empty_targets:
+                            deltas = np.array(target_points)[:, :3] - base_points
+                            if not len(deltas) or np.linalg.norm(deltas, axis=1).max() <= tolerance:
+                                continue
+
+                        if pm.objExists(target_name):
+                            general.error("Can't duplicate blendshape target '%s' since there's already "
+                                          "a mesh in the scene with that name" % target_name)
+
+                        with decorators.UndoDisabled():
+                            mesh_mobject = om.MFnMesh().create(target_points, polygon_counts, polygon_connects)
+                            copied_mesh = pm.PyNode(om.MFnDependencyNode(mesh_mobject).name())
+                            copied_mesh.rename(target_name)
+                        copies.append((index, copied_mesh))
+                        copied_meshes.append(copied_mesh)
+                finally:
+                    _set_weights(bs_node, original_weights)
+        except Exception:
+            if copied_meshes:
+                pm.delete(copied_meshes)
+            raise
+        finally:
+            with decorators.UndoDisabled():
+                pm.delete(wrap_node)
+                if pm.objExists(wrap_base_name):
+                    pm.delete(wrap_base_name)
 
-        for bs_node in blend_shape_nodes:
+        for bs_node, copies in target_copies:
             new_bs_node = pm.createNode("blendShape", name="transfered_%s" % bs_node.name(long=False))
             new_bs_node.setGeometry(target)
 
-            for index, target_name in enumerate(get_blend_shape_target_names(bs_node)):
-                set_blend_shape_value(bs_node, target_name, 1)
-                if not pm.objExists(target_name):
-                    copied_mesh = pm.duplicate(target, name=target_name)[0]
-                    pm.blendShape(new_bs_node, edit=True, target=[target, index, copied_mesh, 1.0])
-                    copied_meshes.append(copied_mesh)
-                else:
-                    general.error("Can't duplicate blendshape target '%s' since there's already "
-                                  "a mesh in the scene with that name" % target_name)
-                    pm.delete(wrap_node)
-                    pm.delete(new_bs_node)
-                    if pm.objExists("%sBase" % source.name(long=False)):
-                        pm.delete("%sBase" % source.name(long=False))
-                    return
+            for index, copied_mesh in copies:
+                pm.blendShape(new_bs_node, edit=True, target=[target, index, copied_mesh, 1.0])
 
             new_bs_nodes.append(new_bs_node)
-            turn_off_all_blend_shapes(bs_node)
 
-        pm.delete(wrap_node)
-        if pm.objExists("%sBase" % source.name(long=False)):
-            pm.delete("%sBase" % source.name(long=False))
         pm.select(target)
         pm.delete(copied_meshes)
 
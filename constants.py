@@ -56,6 +56,6 @@ class ComponentSelectionType():
     poly_vert = 31
     poly_edge = 32
     poly_face = 34
-    all_poly_components = [31, 32, 34]
+    all_poly_components = (poly_vert, poly_edge, poly_face)
     poly_vert_face = 70
     poly_uv = 35
@@ -1,5 +1,5 @@
-from utils import lists
 import pymel.core as pm
+import maya.cmds as cmds
 
 class progress_window(object):
     def __init__(self, title="Working...", status="Working...", start=0, wide=True):
@@ -32,41 +32,57 @@ class progress_window(object):
         self.status = status
         self.step_value = 0
         self.title = title
+        # how many calls of the decorated function are running, only the outermost one opens and closes the window
+        self.depth = 0
+        # set in start(), so update_progress doesn't have to ask Maya on every step
+        self.show_window = False
 
         if wide:
             self.status += " " * 500
 
-        # kill any existing progress windows
-        pm.progressWindow(endProgress=True)
-
     def update_progress(self, step_update=1, status=""):
         if status == "":
             status = self.status
 
         self.step_value += step_update
-        pm.progressWindow(edit=True, progress=self.step_value, status=status)
+        if self.show_window:
+            pm.progressWindow(edit=True, progress=self.step_value, status=status)
 
     def start(self):
+        # there's no UI to show a progress window in when running in batch mode
+        self.show_window = not cmds.about(batch=True)
+        if not self.show_window:
+            return
+
+        # kill any existing progress windows
+        pm.progressWindow(endProgress=True)
         pm.progressWindow(title=self.title, progress=1,
                           status=self.status,
                           maxValue=self.end_value,
                           isInterruptable=False)
 
     def end(self):
-        pm.progressWindow(endProgress=True)
+        if self.show_window:
+            pm.progressWindow(endProgress=True)
+        self.show_window = False
         self.step_value = 0
 
 
     def __call__(self, in_function):
         def wrapped_f(*args, **kwargs):
-            # Start progress
-            self.start()
-            # Call original function
-            result = in_function(*args, **kwargs)
-            # End progress
-            self.end()
-            # return original function result
-            return result
+            # there's only one progress window, so a nested call keeps adding to the progress of the outer call
+            # instead of closing the window when it's done
+            if self.depth == 0:
+                self.start()
+            self.depth += 1
+            try:
+                # Call original function and return its result
+                return in_function(*args, **kwargs)
+            finally:
+                # End progress, even if the function raised
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end()
 
         # Add special methods to the wrapped function
         wrapped_f.update_progress = self.update_progress
@@ -81,17 +97,23 @@ class progress_window(object):
 
 def clear_selection(method):
     def wrapper(*args, **kwargs):
-        pm.select(None)
-        method(*args, **kwargs)
+        cmds.select(clear=True)
+        return method(*args, **kwargs)
 
     return wrapper
 
 def deselect_reselect(method):
     def wrapper(*args, **kwargs):
-        selection = pm.selected()
-        pm.select(None)
-        method(*args, **kwargs)
-        pm.select(selection)
+        # plain long names, so a big (component) selection doesn't get wrapped into PyNodes
+        selection = cmds.ls(selection=True, long=True)
+        cmds.select(clear=True)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if selection:
+                cmds.select(selection, replace=True, noExpand=True)
+            else:
+                cmds.select(clear=True)
 
     return wrapper
 
@@ -100,23 +122,72 @@ class ListNewNodes(object):
     def __init__(self, *args, **kwargs):
         self.existing_nodes = None
         self.ls_args = args
-        self.ls_kwargs = kwargs
+        # the nodes always get listed with long names, so a long or l flag from the caller would clash with that
+        self.ls_kwargs = {key: value for key, value in kwargs.items() if key not in ("long", "l")}
 
         self.result = None
 
     def __enter__(self, *args, **kwargs):
-        self.existing_nodes = pm.ls(*self.ls_args, **self.ls_kwargs)
+        self.existing_nodes = frozenset(cmds.ls(*self.ls_args, long=True, **self.ls_kwargs) or [])
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        post_scene_nodes = cmds.ls(*self.ls_args, long=True, **self.ls_kwargs) or []
+
+        # figure out which nodes have been created, skipping pymel undo nodes that might end up in the list
+        new_nodes = [node for node in post_scene_nodes
+                     if node not in self.existing_nodes and "__pymelUndoNode" not in node]
+
+        self.result = [pm.PyNode(node) for node in new_nodes]
+
+
+class UndoDisabled(object):
+    def __init__(self):
+        """
+        Use this context manager to stop recording undo for everything that happens inside of it, without flushing the
+        undo queue. Handy for temporary nodes that get deleted again before you're done.
+
+        Example use:
+
+        with UndoDisabled():
+            temp_mesh = pm.duplicate(mesh)[0]
+            ...
+            pm.delete(temp_mesh)
+
+        """
+        self.undo_state = None
+
+    def __enter__(self):
+        self.undo_state = cmds.undoInfo(query=True, stateWithoutFlush=True)
+        cmds.undoInfo(stateWithoutFlush=False)
         return self
 
     def __exit__(self, *args, **kwargs):
-        post_scene_nodes = pm.ls(*self.ls_args, **self.ls_kwargs)
+        cmds.undoInfo(stateWithoutFlush=self.undo_state)
 
-        # figure out which nodes have been created
-        new_nodes = lists.difference([self.existing_nodes, post_scene_nodes])
 
-        # remove pymel undo nodes that might end up in the list
-        for new_node in new_nodes:
-            if "__pymelUndoNode" in new_node.name():
-                new_nodes.remove(new_node)
+class UndoChunk(object):
+    def __init__(self, chunk_name=None):
+        """
+        Use this context manager to put everything that happens inside of it into a single undo chunk, so one ctrl+z
+        undoes all of it.
 
-        self.result = new_nodes
+        Example use:
+
+        with UndoChunk():
+            for node in nodes:
+                cmds.rename(node, "new_%s" % node)
+
+        :param chunk_name: <string> optional name of the undo chunk
+        """
+        self.chunk_name = chunk_name
+
+    def __enter__(self):
+        if self.chunk_name:
+            cmds.undoInfo(openChunk=True, chunkName=self.chunk_name)
+        else:
+            cmds.undoInfo(openChunk=True)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        cmds.undoInfo(closeChunk=True)
@@ -4,23 +4,48 @@ import maya.cmds as cmds
 from utils import lists
 from utils import io_utils
 from . import shader
-from .constants import ComponentSelectionType
+from . import decorators
 
 import os
 import re
 import tempfile
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from maya import OpenMayaUI as omui
 from maya import OpenMaya as old_OM
 import maya.api.OpenMaya as om
 
-from PySide6.QtWidgets import *
-from shiboken6 import wrapInstance
+# PySide6 from Maya 2025 on, PySide2 before that
+try:
+    from PySide6.QtWidgets import *
+    from shiboken6 import wrapInstance
+except ImportError:
+    from PySide2.QtWidgets import *
+    from shiboken2 import wrapInstance
 
 import sys
 if sys.version_info.major > 2:
     long = int
 
+VIEWPORT_MESSAGE_COLORS = {
+    "red": 0x00FF0000,
+    "grey": 0x00585858,
+    "gray": 0x00585858,
+    "green": 0x0021610B,
+    "yellow": 0x00666600,
+}
+
+COMPONENT_NUMBER_REGEX = re.compile(r"\[([0-9]+)\]")
+
+PYNODE_CACHE_SIZE = 8192
+_pynode_cache = {}
+
 def maya_useNewAPI():
     """
     So that we can use the Python API 2.0
@@ -37,27 +62,22 @@ def get_shape_nodes(node, intermediate=False):
     :param intermediate: *bool* returns in the intermediate nodes as well. Generally you don't want this
     :return: *list* of all the shape nodes of node
     """
-    if pm.nodeType(node) == "transform":
-        shape_nodes = pm.listRelatives(node, shapes=True, path=True)
-
-        found_shape_nodes = []
+    node_name = str(node)
+    node_type = cmds.nodeType(node_name)
 
-        if shape_nodes is None:
+    if node_type == "transform":
+        if not intermediate:
+            # let Maya filter out the intermediate objects, no need to query every shape ourselves
+            shape_nodes = cmds.listRelatives(node_name, shapes=True, path=True, noIntermediate=True)
+            if shape_nodes:
+                return [pm.PyNode(shape_node) for shape_node in shape_nodes]
             return None
 
-        for shape_node in shape_nodes:
-            is_intermediate = pm.getAttr("%s.intermediateObject" % shape_node)
+        for shape_node in cmds.listRelatives(node_name, shapes=True, path=True) or []:
+            if cmds.getAttr("%s.intermediateObject" % shape_node) and cmds.listConnections(shape_node, source=False):
+                return pm.PyNode(shape_node)
 
-            if intermediate == True and is_intermediate and pm.listConnections(shape_node, source=False):
-                return shape_node
-
-            elif intermediate == False and not is_intermediate:
-                found_shape_nodes.append(shape_node)
-
-        if len(found_shape_nodes) > 0:
-            return found_shape_nodes
-
-    elif pm.nodeType(node) in ["mesh", "nurbsCurve", "nurbsSurface"]:
+    elif node_type in ["mesh", "nurbsCurve", "nurbsSurface"]:
         return [pm.PyNode(node)]
 
     return None
@@ -83,9 +103,20 @@ def get_all_meshes(as_transforms=False, as_shape_nodes=False):
         as_transforms = True
 
     if as_transforms:
-        return list(set([node.getTransform() for node in pm.ls(type="mesh")]))
+        return [pm.PyNode(transform) for transform in _get_mesh_transform_names()]
     if as_shape_nodes:
-        return list(set([node for node in pm.ls(type="mesh")]))
+        # intermediate (orig) shapes are meshes too, and have always been part of this list
+        return [pm.PyNode(shape) for shape in cmds.ls(type="mesh", long=True) or []]
+
+def _get_mesh_transform_names():
+    """
+    Returns the full paths of every transform in the scene that has a mesh under it. The parent of a shape is read from
+    its full path, so this is a single ls call no matter how many meshes there are
+
+    :return: *list* of strings
+    """
+    shapes = cmds.ls(type="mesh", long=True, noIntermediate=True) or []
+    return list(dict.fromkeys([shape.rsplit("|", 1)[0] for shape in shapes]))
 
 def get_all_visibile_meshes(as_transforms=False, as_shape_nodes=False):
     """
@@ -100,15 +131,27 @@ def get_all_visibile_meshes(as_transforms=False, as_shape_nodes=False):
 
     if pm.isolateSelect(active_panel, query=True, state=True):
         iso_select_objects = pynode(pm.isolateSelect(active_panel, query=True, viewObjects=True)).flattened()
-        iso_select_meshes = get_from_list(iso_select_objects, meshes=True)
-        visible_meshes = [mesh for mesh in iso_select_meshes if mesh.visibility.get() == True]
+        iso_select_meshes = get_from_list(iso_select_objects, meshes=True) or []
+        visible_meshes = [mesh_name for mesh_name in dict.fromkeys([mesh.longName() for mesh in iso_select_meshes])
+                          if cmds.getAttr("%s.visibility" % mesh_name)]
     else:
-        visible_meshes = pm.ls(get_all_meshes(as_transforms=True), visible=True)
+        mesh_transforms = _get_mesh_transform_names()
+        visible_meshes = []
+        if mesh_transforms:
+            visible_meshes = cmds.ls(mesh_transforms, visible=True, long=True) or []
 
     if as_transforms:
-        return list(set([node.getTransform() for node in visible_meshes]))
+        return [pm.PyNode(transform) for transform in dict.fromkeys(visible_meshes)]
     if as_shape_nodes:
-        return list(set([get_shape_nodes(node)[0] for node in visible_meshes]))
+        shapes = []
+        if visible_meshes:
+            shapes = cmds.listRelatives(visible_meshes, shapes=True, noIntermediate=True, fullPath=True) or []
+
+        # only keep the first shape of every transform
+        shape_per_transform = {}
+        for shape in shapes:
+            shape_per_transform.setdefault(shape.rsplit("|", 1)[0], shape)
+        return [pm.PyNode(shape) for shape in shape_per_transform.values()]
 
 def get_shortest_name(node, strip_namespace=True):
     """
@@ -117,6 +160,16 @@ def get_shortest_name(node, strip_namespace=True):
     :param node: *pynode*
     :return: <str>
     """
+    if isinstance(node, str):
+        # strings don't need a PyNode when ls finds exactly one node, the leaf of its path is the name we want,
+        # same as node.name(long=None) below
+        short_names = cmds.ls(node, shortNames=True) or []
+        if len(short_names) == 1:
+            leaf_name = short_names[0].rsplit("|", 1)[-1]
+            if strip_namespace:
+                return _strip_namespace_from_path(leaf_name)
+            return leaf_name
+
     node = pynode(node)
     return node.name(long=None, stripNamespace=strip_namespace)
 
@@ -176,9 +229,20 @@ def remove_namespace(object_name):
     :param object_name: *string*
     :return:
     """
+    if isinstance(object_name, str):
+        return _strip_namespace_from_path(object_name)
 
     return pynode(object_name).stripNamespace()
 
+def _strip_namespace_from_path(path):
+    """
+    Strips the namespaces from every part of a (dag path) string, without going through a PyNode
+
+    :param path: *string*
+    :return: *string*
+    """
+    return "|".join([part.rpartition(":")[2] for part in path.split("|")])
+
 def get_namespace(object_name):
     """
     Returns the namespace from a string
@@ -187,15 +251,7 @@ def get_namespace(object_name):
     :return:
     """
 
-    parts = object_name.split("|")
-    result = ""
-
-    for index, part in enumerate(parts):
-        if index > 0:
-            result += "|"
-        result += part.split(":")[0]
-
-    return result
+    return "|".join([part.partition(":")[0] for part in object_name.split("|")])
 
 def set_node_namespace(nodes, namespace):
     """
@@ -208,12 +264,16 @@ def set_node_namespace(nodes, namespace):
     if not isinstance(nodes, list):
         nodes = [nodes]
 
-    if not pm.namespace(exists=namespace):
-        pm.namespace(addNamespace=namespace)
+    if not cmds.namespace(exists=namespace):
+        cmds.namespace(addNamespace=namespace)
 
-    for node in nodes:
-        node = pynode(node)
-        node.rename("{}:{}".format(namespace, node.nodeName()))
+    # rename the deepest nodes first, so the long names of their parents are still valid when it's their turn
+    node_names = cmds.ls([str(node) for node in nodes], long=True) or []
+    node_names.sort(key=lambda node_name: node_name.count("|"), reverse=True)
+
+    with decorators.UndoChunk():
+        for node_name in node_names:
+            cmds.rename(node_name, "{}:{}".format(namespace, node_name.rsplit("|", 1)[-1]))
 
 def add_to_display_layer(objects, display_layer_name):
     """
@@ -263,39 +323,43 @@ def get_empty_display_layers():
     Returns a list of all empty display layers in the scene
     :return: *list*
     """
-    empty_layers = []
-    for layer in pm.ls(type="displayLayer"):
-        if pm.editDisplayLayerMembers(layer, query=True) is None:
-            empty_layers.append(layer)
-
-    return empty_layers
+    return [pm.PyNode(layer) for layer in _partition_display_layers()[0]]
 
 def get_non_empty_display_layers():
     """
     Returns all display layers that have at least one thing in it
     :return:
     """
-    dilledaddles = []
-    for layer in pm.ls(type="displayLayer"):
-        if pm.editDisplayLayerMembers(layer, query=True):
-            dilledaddles.append(layer)
+    return [pm.PyNode(layer) for layer in _partition_display_layers()[1]]
+
+def _partition_display_layers():
+    """
+    Splits all the display layers in the scene into empty and non empty ones, in a single pass over the layers
+
+    :return: *tuple* of two lists of display layer names: (empty, non_empty)
+    """
+    empty_layers = []
+    non_empty_layers = []
+    for layer in cmds.ls(type="displayLayer") or []:
+        if cmds.editDisplayLayerMembers(layer, query=True):
+            non_empty_layers.append(layer)
+        else:
+            empty_layers.append(layer)
 
-    return dilledaddles
+    return empty_layers, non_empty_layers
 
 def to_pynodes(input_list):
     """
     One liner to convert a list of nodes to PyNodes
 
-    :param input_list: *list* of node names
+    :param input_list: *list* (or any other iterable) of node names and/or PyNodes. Nodes that already are PyNodes
+    are passed through as they are
     :return: *list* of PyNodes
     """
-    if not isinstance(input_list, list):
+    if isinstance(input_list, (str, pm.PyNode)) or not hasattr(input_list, "__iter__"):
         input_list = [input_list]
 
-    pynode_list = []
-    for node in input_list:
-        pynode_list.append(pynode(node))
-    return pynode_list
+    return [node if isinstance(node, pm.PyNode) else pynode(node) for node in input_list]
 
 def mpoint_to_vector(mpoint):
     """
@@ -334,39 +398,122 @@ def pynode(object_name, specific_on_multiple=False, pick_most_root=False, pick_m
     if type(object_name) == om.MFnDependencyNode:
         object_name = object_name.name()
 
+    # already a PyNode, nothing to look up
+    if isinstance(object_name, pm.nt.DependNode) and object_name.exists():
+        return object_name
+
+    is_name = isinstance(object_name, str)
+    if is_name:
+        cached_node = _get_cached_pynode(object_name)
+        if cached_node is not None:
+            return cached_node
+
+    # try making the PyNode straight away, only when that fails do we need to find out if the object doesn't exist or
+    # if there are multiple objects with the same name
+    try:
+        found_node = pm.PyNode(object_name)
+    except:
+        found_node = None
+
+    if found_node is not None:
+        if is_name and isinstance(found_node, pm.nt.DependNode):
+            _cache_pynode(object_name, found_node)
+        return found_node
+
     if pm.objExists(object_name):
-        try:
-            return pm.PyNode(object_name)
-        except:
-            if not type(object_name) == str:
-                node_name = object_name.nodeName()
+        if not type(object_name) == str:
+            node_name = object_name.nodeName()
+        else:
+            node_name = object_name
+        multiple_nodes = sorted([str(node) for node in pm.ls(node_name)], key=len)
+
+        if len(multiple_nodes) > 1:
+            if specific_on_multiple is False:
+                error_message = "There are multiple nodes with this name:"
+                for node in multiple_nodes:
+                    error_message += "\n%s" % node
+                raise RuntimeError(error_message)
             else:
-                node_name = object_name
-            multiple_nodes = sorted([str(node) for node in pm.ls(node_name)], key=len)
-
-            if len(multiple_nodes) > 1:
-                if specific_on_multiple is False:
-                    error_message = "There are multiple nodes with this name:"
-                    for node in multiple_nodes:
-                        error_message += "\n%s" % node
-                    raise RuntimeError(error_message)
-                else:
-                    if pick_most_root is True:
-                        return pm.PyNode(multiple_nodes[0])
-                    elif pick_most_leaf is True:
-                        return pm.PyNode(multiple_nodes[-1])
-                    elif pick_index is not None:
-                        try:
-                            selected_node = multiple_nodes[pick_index]
-                        except IndexError:
-                            raise IndexError("%s is not a valid index, valid indices are 0 to %s"
-                                             % (pick_index, len(multiple_nodes) - 1))
-                        return pm.PyNode(selected_node)
-
-                    error("When custom_on_multiple is set to True, either pick_most_root or pick_most_leaf "
-                          "should be set to True as well")
+                if pick_most_root is True:
+                    return pm.PyNode(multiple_nodes[0])
+                elif pick_most_leaf is True:
+                    return pm.PyNode(multiple_nodes[-1])
+                elif pick_index is not None:
+                    try:
+                        selected_node = multiple_nodes[pick_index]
+                    except IndexError:
+                        raise IndexError("%s is not a valid index, valid indices are 0 to %s"
+                                         % (pick_index, len(multiple_nodes) - 1))
+                    return pm.PyNode(selected_node)
+
+                error("When custom_on_multiple is set to True, either pick_most_root or pick_most_leaf "
+                      "should be set to True as well")
     else:
-        error("Can't make a PyNode. Object (%s) doesn't exist" % object)
+        error("Can't make a PyNode. Object (%s) doesn't exist" % object_name)
+
+def _get_cached_pynode(object_name):
+    """
+    Returns the PyNode pynode() made for object_name before, as long as that node still exists and still goes by that
+    name. Otherwise the stale entry is dropped and None is returned
+
+    :param object_name: *string*
+    :return: a PyNode or None
+    """
+    cached_node = _pynode_cache.get(object_name)
+    if cached_node is None:
+        return None
+
+    try:
+        if cached_node.exists():
+            if object_name == cached_node.name():
+                return cached_node
+            if isinstance(cached_node, pm.nt.DagNode) and object_name == cached_node.longName():
+                return cached_node
+    except:
+        pass
+
+    _pynode_cache.pop(object_name, None)
+    return None
+
+def _cache_pynode(object_name, node):
+    """
+    Remembers the PyNode that was made for object_name
+
+    :param object_name: *string*
+    :param node: PyNode
+    :return: None
+    """
+    if len(_pynode_cache) >= PYNODE_CACHE_SIZE:
+        _pynode_cache.clear()
+    _pynode_cache[object_name] = node
+
+def _clear_pynode_cache(*args):
+    """
+    Scene callback that empties the pynode() cache, since none of the cached nodes survive a new or opened scene
+
+    :return: None
+    """
+    _pynode_cache.clear()
+
+def _register_scene_callbacks(callbacks_name, function, scene_messages):
+    """
+    Adds a scene callback to function for every scene message. The ids are kept in the module global called
+    callbacks_name, and the callbacks that are already in there get removed first, so reloading this module doesn't
+    leave callbacks behind that call functions of the old module
+
+    :param callbacks_name: *string* name of the module global that holds the callback ids
+    :param function: function to call
+    :param scene_messages: *list* of MSceneMessage message types, like om.MSceneMessage.kAfterOpen
+    :return: *list* of callback ids
+    """
+    existing_callbacks = globals().get(callbacks_name)
+    if existing_callbacks:
+        om.MMessage.removeCallbacks(existing_callbacks)
+
+    return [om.MSceneMessage.addCallback(scene_message, function) for scene_message in scene_messages]
+
+_pynode_cache_callbacks = _register_scene_callbacks("_pynode_cache_callbacks", _clear_pynode_cache,
+                                                    [om.MSceneMessage.kAfterNew, om.MSceneMessage.kAfterOpen])
 
 def success(message):
     """
@@ -403,21 +550,11 @@ def show_viewport_message(message, color, echo=True, visible_time=1500):
     Shows a viewport message with a chosen color
 
     :param message: *string* message you want to show
-    :param color: hexadecimal color code
+    :param color: *string* one of the keys of VIEWPORT_MESSAGE_COLORS, anything else shows up grey
     :param echo: *bool* if True, will also just print the message in the script editor
     :return:
     """
-    try:
-        if color.lower() == "red":
-            back_color = 0x00FF0000
-        elif color.lower() == "grey" or color.lower() == "gray":
-            back_color = 0x00585858
-        elif color.lower() == "green":
-            back_color = 0x0021610B
-        elif color.lower() == "yellow":
-            back_color = 0x00666600
-    except:
-        pass
+    back_color = VIEWPORT_MESSAGE_COLORS.get(str(color).lower(), VIEWPORT_MESSAGE_COLORS.get("grey"))
 
     pm.inViewMessage(statusMessage=message, backColor=back_color, fadeStayTime=visible_time, fade=True,
                      position="topCenter")
@@ -436,7 +573,7 @@ def set_matrix(source, target):
     target = pynode(target)
     target.setMatrix(source.getMatrix(worldSpace=True))
 
-def lock_and_hide_selected(node, attribute_list=[], translate=False, rotate=False, scale=False, lock=True, visible=False):
+def lock_and_hide_selected(node, attribute_list=None, translate=False, rotate=False, scale=False, lock=True, visible=False):
     """
     Locks and hides attributes
 
@@ -449,8 +586,10 @@ def lock_and_hide_selected(node, attribute_list=[], translate=False, rotate=Fals
     :param visible: *bool*
     :return: None
     """
-    node = pynode(node)
+    node_name = str(pynode(node))
 
+    # copy the list so we never add the transform channels to the list that was passed in
+    attribute_list = list(attribute_list) if attribute_list else []
     if translate:
         attribute_list.extend(["translateX", "translateY", "translateZ"])
     if rotate:
@@ -458,8 +597,7 @@ def lock_and_hide_selected(node, attribute_list=[], translate=False, rotate=Fals
     if scale:
         attribute_list.extend(["scaleX", "scaleY", "scaleZ"])
     for attribute in attribute_list:
-        node.setAttr(attribute, lock=lock)
-        node.setAttr(attribute, keyable=visible)
+        cmds.setAttr("%s.%s" % (node_name, attribute), lock=lock, keyable=visible)
 
 def lock_and_hide_default_attributes(node):
     lock_and_hide_selected(node, translate=True, rotate=True, scale=True, attribute_list=["visibility"])
@@ -473,16 +611,7 @@ def get_point_list_from_curve(curve):
     """
     curve = pynode(curve)
 
-    pos_list = []
-
-    for point in curve.getCVs():
-        x = float("%.3f" % point[0])
-        y = float("%.3f" % point[1])
-        z = float("%.3f" % point[2])
-
-        pos_list.append((x, y, z))
-
-    return pos_list
+    return [(round(point[0], 3), round(point[1], 3), round(point[2], 3)) for point in curve.getCVs()]
 
 def invert_point_list_along_axis(axis, point_list):
     """
@@ -493,25 +622,18 @@ def invert_point_list_along_axis(axis, point_list):
     :param point_list: *list* of tuples or lists representing a point in 3D space. [0, -0.4, 4]
     :return: *list* of inverted points
     """
-    axis = axis.lower()
-    new_point_list = []
-
-    for point in point_list:
-        new_x = point[0]
-        new_y = point[1]
-        new_z = point[2]
+    if len(point_list) == 0:
+        return []
 
-        if axis == "x":
-            new_x = new_x * -1
-        if axis == "y":
-            new_y = new_y * -1
-        if axis == "z":
-            new_z = new_z * -1
+    point_array = np.array(point_list, dtype=np.float64)
+    if point_array.ndim != 2:
+        raise ValueError("point_list should be a list of points that all have the same number of values")
 
-        new_point = (new_x, new_y, new_z)
-        new_point_list.append(new_point)
+    axis_index = {"x": 0, "y": 1, "z": 2}.get(axis.lower())
+    if axis_index is not None:
+        point_array[:, axis_index] *= -1
 
-    return new_point_list
+    return [tuple(point) for point in point_array.tolist()]
 
 def is_joint(node):
     """
@@ -550,17 +672,18 @@ def get_scene_path(full_path=True, name_only=False, folder_only=False, extension
     :param extension: *bool* whether or not to return the name with the extension
     :return: *string*
     """
+    scene_name = pm.sceneName()
     if name_only:
-        name = os.path.basename(pm.sceneName())
+        name = os.path.basename(scene_name)
         if extension:
             return name
         return os.path.splitext(name)[0]
     if folder_only:
-        return os.path.dirname(pm.sceneName())
+        return os.path.dirname(scene_name)
     if full_path:
         if extension:
-            return pm.sceneName()
-        return os.path.splitext(pm.sceneName())[0]
+            return scene_name
+        return os.path.splitext(scene_name)[0]
     return ""
 
 def get_active_camera():
@@ -596,6 +719,15 @@ def selection(as_strings=False, as_pynodes=False, st=False, py=False):
     if as_pynodes or py:
         return pm.selected()
 
+def selection_iter():
+    """
+    Lazy version of selection(as_pynodes=True). Yields the selected nodes one by one as PyNodes, so nothing gets
+    wrapped until you actually get to it. Handy for big selections when you're looking for something and break out
+    of the loop early
+
+    :return: *generator* of PyNodes
+    """
+    return (pm.PyNode(node) for node in cmds.ls(selection=True, long=True) or [])
 
 def flatten_component_list(component_list, as_pynodes=False):
     """
@@ -632,47 +764,95 @@ def get_from_list(input_list, meshes=False, all_components=False, vertices=False
     if not input_list or len(input_list) == 0:
         return
 
+    if not isinstance(input_list, (list, tuple)):
+        input_list = [input_list]
+    flat_list = cmds.ls([str(item) for item in input_list], flatten=True, long=True) or []
+
+    # sort everything into buckets in a single pass, components are recognized by their name alone
+    component_lists = {".vtx[": [], ".e[": [], ".f[": []}
+    poly_component_list = []
+    node_list = []
+    for item in flat_list:
+        component_start = item.rfind(".")
+        if component_start == -1:
+            node_list.append(item)
+            continue
+
+        component_list = component_lists.get(item[component_start:item.find("[", component_start) + 1])
+        if component_list is not None:
+            component_list.append(item)
+            poly_component_list.append(item)
+
+    # one ls call gives us the type of every node, the inheritance is only looked up once per type
+    shown_types = []
+    if node_list:
+        shown_types = cmds.ls(node_list, showType=True, long=True) or []
+    node_types = dict(zip(shown_types[::2], shown_types[1::2]))
+    inherited_types = {}
+
+    def inherits(node_type, base_type):
+        if not node_type:
+            return False
+        if node_type not in inherited_types:
+            inherited_types[node_type] = set(cmds.nodeType(node_type, inherited=True, isTypeName=True) or [])
+        return base_type in inherited_types[node_type]
+
+    transform_list = [node for node in node_list if inherits(node_types.get(node, ""), "transform")]
+
+    # transforms that have a mesh under them, straight from one filtered listRelatives call
+    mesh_parents = set()
+    if meshes and transform_list:
+        mesh_shapes = cmds.listRelatives(transform_list, shapes=True, type="mesh", noIntermediate=True,
+                                         fullPath=True) or []
+        mesh_parents = {mesh_shape.rsplit("|", 1)[0] for mesh_shape in mesh_shapes}
+
+    # type of the first shape under every transform, in one batched query
+    shape_types = {}
+    if (groups or nurbs_curves) and transform_list:
+        shape_nodes = cmds.listRelatives(transform_list, shapes=True, noIntermediate=True, fullPath=True) or []
+        shown_shape_types = []
+        if shape_nodes:
+            shown_shape_types = cmds.ls(shape_nodes, showType=True, long=True) or []
+        for shape_node, shape_type in zip(shown_shape_types[::2], shown_shape_types[1::2]):
+            shape_types.setdefault(shape_node.rsplit("|", 1)[0], shape_type)
+
     return_list = []
-    input_list = pm.ls(input_list, flatten=True)
 
     if meshes:
-        meshes = []
-        for node in pm.ls(input_list, type="transform", long=True):
-            try:
-                if node.getShape().type() == "mesh":
-                    meshes.append(node)
-            except:
-                pass
-
-        return_list.extend(meshes)
+        return_list.extend([node for node in transform_list if node in mesh_parents])
 
     if all_components:
-        return_list.extend(pm.filterExpand(input_list, selectionMask=ComponentSelectionType.all_poly_components))
+        return_list.extend(poly_component_list)
 
     if vertices:
-        return_list.extend(pm.filterExpand(input_list, selectionMask=ComponentSelectionType.poly_vert))
+        return_list.extend(component_lists.get(".vtx["))
 
     if edges:
-        return_list.extend(pm.filterExpand(input_list, selectionMask=ComponentSelectionType.poly_edge))
+        return_list.extend(component_lists.get(".e["))
 
     if faces:
-        return_list.extend(pm.filterExpand(input_list, selectionMask=ComponentSelectionType.poly_face))
+        return_list.extend(component_lists.get(".f["))
 
     if joints:
-        return_list.extend(pm.ls(input_list, type="joint"))
+        return_list.extend([node for node in node_list if inherits(node_types.get(node, ""), "joint")])
 
     if constraints:
-        return_list.extend(pm.ls(input_list, type="constraint"))
+        return_list.extend([node for node in node_list if inherits(node_types.get(node, ""), "constraint")])
 
     if nurbs_curves:
-        return_list.extend([node.getParent() for node in pm.ls(type="nurbsCurve")])
+        for node in node_list:
+            if shape_types.get(node) == "nurbsCurve":
+                return_list.append(node)
+            elif node_types.get(node) == "nurbsCurve":
+                return_list.append(node.rsplit("|", 1)[0])
 
     if groups:
-        return_list.extend([node for node in pm.ls(input_list, type="transform") if is_group(node)])
+        return_list.extend([node for node in transform_list
+                            if node_types.get(node) == "transform" and node not in shape_types])
 
     if transforms:
-        return_list.extend([node for node in pm.ls(input_list, type="transform")])
-    return [pm.PyNode(each) for each in lists.remove_duplicates(return_list)]
+        return_list.extend(transform_list)
+    return [pm.PyNode(each) for each in dict.fromkeys(return_list)]
 
 def is_group(node):
     """
@@ -705,24 +885,14 @@ def is_empty_group(group_node, include_empty_child_groups=True):
     empty. If set to False, will return False even if the top group has empty groups inside
     :return: *bool*
     """
-    is_empty = True
     group_node = pm.PyNode(group_node)
 
     if not is_group(group_node):
         return False
 
     if include_empty_child_groups:
-        try:
-            for child in group_node.getChildren():
-                if not is_group(child):
-                    is_empty = False
-                    break
-                else:
-                    is_empty = is_empty_group(child)
-        except:
-            pass
-        finally:
-            return is_empty
+        # every child needs to be an empty group itself, is_empty_group returns False for anything that isn't a group
+        return all(is_empty_group(child) for child in group_node.getChildren())
     else:
         if len(group_node.getChildren()) == 0:
             return True
@@ -736,7 +906,24 @@ def get_all_empty_groups(include_empty_child_groups=True):
     empty. If set to False, will return False even if the top group has empty groups inside
     :return: *list* of all the empty groups
     """
-    return [group for group in get_from_list(pm.ls(), groups=True) if is_empty_group(group, include_empty_child_groups)]
+    # grab the whole dag in one go and work out the hierarchy from the full paths, instead of asking every group for
+    # its children and shapes
+    children = {}
+    for dag_node in cmds.ls(dag=True, long=True) or []:
+        children.setdefault(dag_node.rsplit("|", 1)[0], []).append(dag_node)
+
+    shape_parents = set([shape.rsplit("|", 1)[0] for shape in cmds.ls(shapes=True, noIntermediate=True, long=True) or []])
+    groups = [node for node in cmds.ls(exactType="transform", long=True) or [] if node not in shape_parents]
+
+    # deepest groups first, so the child groups are always done before their parent
+    empty = {}
+    for group in sorted(groups, key=lambda node: node.count("|"), reverse=True):
+        if include_empty_child_groups:
+            empty[group] = all(empty.get(child, False) for child in children.get(group, []))
+        else:
+            empty[group] = group not in children
+
+    return [pm.PyNode(group) for group in groups if empty[group]]
 
 def is_point_inside_mesh(point, mesh_name, direction=[0.0, 0.0, 1.0]):
     """
@@ -748,32 +935,43 @@ def is_point_inside_mesh(point, mesh_name, direction=[0.0, 0.0, 1.0]):
     :param direction: *list* direction you want the ray to shoot in
     :return: bool
     """
+    return _make_inside_tester(mesh_name, direction)(point)
+
+def _make_inside_tester(mesh_name, direction=(0.0, 0.0, 1.0)):
+    """
+    Builds a function that checks if a point is inside mesh_name. The mesh function set, ray direction and hit array are
+    made once and bound as locals, so testing a lot of points only costs the allIntersections call: an odd number of
+    hits along the ray means we're inside
+
+    :param mesh_name: *string* mesh you want to check for
+    :param direction: *list* direction you want the ray to shoot in
+    :return: function that takes a (float, float, float) point and returns a bool
+    """
     sel = old_OM.MSelectionList()
     dag = old_OM.MDagPath()
 
     sel.add(mesh_name, False)
     sel.getDagPath(0, dag)
 
-    mesh_name = old_OM.MFnMesh(dag)
-
-    point = old_OM.MFloatPoint(*point)
-    direction = old_OM.MFloatVector(*direction)
-    farray = old_OM.MFloatPointArray()
-
-    mesh_name.allIntersections(
-        point, direction,
-        None, None, False,
-        old_OM.MSpace.kWorld,
-        10000,
-        False, None, False,
-        farray,
-        None, None, None, None, None
-    )
-
-    if farray.length() % 2 == 1:
-        return True
-    else:
-        return False
+    fn_mesh = old_OM.MFnMesh(dag)
+    ray_direction = old_OM.MFloatVector(*direction)
+    hit_points = old_OM.MFloatPointArray()
+    float_point = old_OM.MFloatPoint
+    world_space = old_OM.MSpace.kWorld
+    all_intersections = fn_mesh.allIntersections
+
+    def is_inside(point):
+        hit_points.clear()
+        all_intersections(float_point(*point), ray_direction,
+                          None, None, False,
+                          world_space,
+                          10000,
+                          False, None, False,
+                          hit_points,
+                          None, None, None, None, None)
+        return hit_points.length() % 2 == 1
+
+    return is_inside
 
 def get_vertices_inside_mesh(source_object, volume_object):
     """
@@ -787,11 +985,15 @@ def get_vertices_inside_mesh(source_object, volume_object):
     source_object = pynode(source_object)
     volume_object = pynode(volume_object)
 
+    # resolve the volume mesh once instead of once per vertex
+    is_inside = _make_inside_tester(volume_object.name())
+    source_name = source_object.name()
+
     found_vertices = []
     vertex_positions = get_vertex_pos_of_mesh(source_object)
     for index, point in enumerate(vertex_positions):
-        if is_point_inside_mesh(point, volume_object.name()):
-            found_vertices.append("%s.vtx[%s]" % (source_object.name(), index))
+        if is_inside(point):
+            found_vertices.append("%s.vtx[%s]" % (source_name, index))
 
     return found_vertices
 
@@ -802,10 +1004,7 @@ def component_is_selected():
 
     :return:
     """
-    selection = pm.selected()
-    if not selection:
-        return False
-    return any([face_is_selected(selection[0]), edge_is_selected(selection[0]), vertex_is_selected(selection[0])])
+    return _get_selected_component_type() is not None
 
 
 def face_is_selected(selection=None):
@@ -814,12 +1013,7 @@ def face_is_selected(selection=None):
 
     :return:
     """
-    if selection is None:
-        selection = pm.selected()[0]
-
-    if selection.__class__ is pm.general.MeshFace:
-        return True
-    return False
+    return _get_selected_component_type(selection) == ".f["
 
 
 def edge_is_selected(selection=None):
@@ -828,12 +1022,7 @@ def edge_is_selected(selection=None):
 
     :return:
     """
-    if selection is None:
-        selection = pm.selected()[0]
-
-    if selection.__class__ is pm.general.MeshEdge:
-        return True
-    return False
+    return _get_selected_component_type(selection) == ".e["
 
 
 def vertex_is_selected(selection=None):
@@ -842,20 +1031,40 @@ def vertex_is_selected(selection=None):
 
     :return:
     """
+    return _get_selected_component_type(selection) == ".vtx["
+
+
+def _get_selected_component_type(selection=None):
+    """
+    Checks the name of selection (or the first thing in your selection list) to see what kind of mesh component it is.
+    Only looks at the string, so no PyNodes get made
+
+    :param selection: *string* or *pynode*. When None, the first item in the selection list is used
+    :return: *string* ".vtx[", ".e[" or ".f[", None if it's not a mesh component
+    """
     if selection is None:
-        selection = pm.selected()[0]
+        selection = cmds.ls(selection=True)
+        if not selection:
+            return None
+        selection = selection[0]
 
-    if selection.__class__ is pm.general.MeshVertex:
-        return True
-    return False
+    selection = str(selection)
+    if not selection.endswith("]"):
+        return None
+
+    for component_type in (".vtx[", ".e[", ".f["):
+        if component_type in selection:
+            return component_type
+    return None
 
 
-def get_vertex_pos_of_mesh(mesh, as_mpoint_array=False):
+def get_vertex_pos_of_mesh(mesh, as_mpoint_array=False, as_numpy=False):
     """
     Returns a list of all the vertex positions in a mesh
 
     :param mesh: *string* or *pynode* of the mesh you want to check
     :param as_mpoint_array: *list* of Maya MPoints instead of a normal float list
+    :param as_numpy: *bool* returns a (number of vertices, 3) numpy array instead of a normal float list
     :return:
     """
     try:
@@ -867,21 +1076,31 @@ def get_vertex_pos_of_mesh(mesh, as_mpoint_array=False):
     selection_list.add(mesh)
 
     dag_path = selection_list.getDagPath(0)
-    mpoint_array = om.MFnMesh(dag_path).getPoints(om.MSpace.kWorld)
+    mfn_mesh = om.MFnMesh(dag_path)
 
     if as_mpoint_array:
-        return mpoint_array
+        return mfn_mesh.getPoints(om.MSpace.kWorld)
 
-    else:
-        point_list = []
-        for mpoint in mpoint_array:
-            point_list.append([mpoint[0], mpoint[1], mpoint[2]])
+    point_array = _get_points_as_numpy(mfn_mesh)
+    if as_numpy:
+        return point_array
 
-        return point_list
+    return point_array.tolist()
 
     #pymel way, much more concise but also slower:
     # pynode(mesh).getShape().getPoints()
 
+def _get_points_as_numpy(mfn_mesh):
+    """
+    Returns the world space vertex positions of an MFnMesh as a (number of vertices, 3) numpy array. API 2.0's
+    MPointArray has no buffer protocol, so numpy still reads it point by point through the sequence protocol. That
+    happens inside numpy instead of in a Python loop, but it's a copy of every point, not a view
+
+    :param mfn_mesh: *MFnMesh*
+    :return: *numpy.ndarray*
+    """
+    return np.array(mfn_mesh.getPoints(om.MSpace.kWorld), dtype=np.float64).reshape(-1, 4)[:, :3]
+
 def meshes_to_dictionary(meshes, dump_to_file=False, file_name=None):
     """
     Turns a list of meshes into one big dictionary to reconstruct it. Calls mesh_as_dictionary for every mesh in the
@@ -898,17 +1117,18 @@ def meshes_to_dictionary(meshes, dump_to_file=False, file_name=None):
         data_dict[mesh.name()] = mesh_as_dictionary(mesh)
 
     if dump_to_file:
-        io_utils.write_json(data_dict, file_name)
+        _write_mesh_json(data_dict, file_name)
 
     return data_dict
 
-def mesh_as_dictionary(mesh, name=None, include_blend_shapes=True, dump_to_file=False, file_name=None):
+def mesh_as_dictionary(mesh, name=None, include_blend_shapes=True, dump_to_file=False, file_name=None, binary=False):
     """
     Returns a dictionary that describes a mesh so it's possible to later rebuild that mesh from pure data. It saves:
 
     :param mesh: *string* or *pynode* of the mesh you want to save
     :param dump_to_file: *bool* will save out the dict as a json
     :param file_name: *string* file path of where you want to save the json
+    :param binary: *bool* saves the big arrays in a compressed .npz next to the json, see write_mesh_dictionary
     :return: <dict> in the form of:
 
         data_dict = {
@@ -945,42 +1165,32 @@ def mesh_as_dictionary(mesh, name=None, include_blend_shapes=True, dump_to_file=
     selection_list.add(mesh.name())
     mfn_mesh = om.MFnMesh(selection_list.getDagPath(0))
 
-    vertex_position_list = get_vertex_pos_of_mesh(mesh.name())
+    # the MFnMesh we already have gives the positions, no need to look the mesh up again for every call
+    vertex_position_list = _get_points_as_numpy(mfn_mesh).tolist()
     num_vertices = len(vertex_position_list)
-    num_polygons = len(mesh.faces)
-    polygon_count_list = [len(face.getVertices()) for face in mesh.faces]
-    polygon_connections_list = lists.flatten([face.getVertices() for face in mesh.faces])
-    assigned_uvs = mfn_mesh.getAssignedUVs()
-    assigned_uvs = ([value for value in assigned_uvs[0]], [value for value in assigned_uvs[1]])
-    uvs = mfn_mesh.getUVs()
-    uvs = ([value for value in uvs[0]], [value for value in uvs[1]])
+    num_polygons = mfn_mesh.numPolygons
+    # per face vertex counts and the flat list of face vertex ids in one go, instead of making a MeshFace per face
+    polygon_counts, polygon_connections = mfn_mesh.getVertices()
+    polygon_count_list = list(polygon_counts)
+    polygon_connections_list = list(polygon_connections)
+    uv_counts, uv_ids = mfn_mesh.getAssignedUVs()
+    assigned_uvs = (list(uv_counts), list(uv_ids))
+    u_values, v_values = mfn_mesh.getUVs()
+    uvs = (list(u_values), list(v_values))
 
     blend_shape_dictionary = {}
     if include_blend_shapes:
         blend_shape_nodes = bs.get_blend_shape_nodes(mesh)
         if blend_shape_nodes:
             for blend_shape_node in blend_shape_nodes:
-                bs.turn_off_all_blend_shapes(blend_shape_node)
-                blend_shapes = bs.get_blend_shape_target_names(blend_shape_node)
-                blend_shape_dictionary[blend_shape_node.name()] = {}
-
-                if blend_shapes:
-                    for blend_shape_name in blend_shapes:
-                        bs.set_blend_shape_value(blend_shape_node, blend_shape_name, 1)
-                        blend_shape_dictionary[blend_shape_node.name()][blend_shape_name] = get_vertex_pos_of_mesh(mesh)
+                target_dictionary = blend_shape_dictionary[blend_shape_node.name()] = {}
+                for blend_shape_name in bs.each_blend_shape_target(blend_shape_node):
+                    target_dictionary[blend_shape_name] = _get_points_as_numpy(mfn_mesh).tolist()
 
-                bs.turn_off_all_blend_shapes(blend_shape_node)
-
-    selection_list = om.MSelectionList()
-    selection_list.add(mesh.name())
-
-    dag_path = selection_list.getDagPath(0)
-    edge_iterator = om.MItMeshEdge(dag_path)
-    hard_edge_info = []
-
-    while not edge_iterator.isDone():
-        hard_edge_info.append([int(edge_iterator.index()), edge_iterator.isSmooth])
-        edge_iterator.next()
+    # ask the mesh for the smoothing of every edge by index, one API call per edge instead of the four an
+    # MItMeshEdge loop needs (isDone, index, isSmooth and next)
+    is_edge_smooth = mfn_mesh.isEdgeSmooth
+    hard_edge_info = [[edge_index, is_edge_smooth(edge_index)] for edge_index in range(mfn_mesh.numEdges)]
 
     if name is None:
         name = mesh.name()
@@ -1001,7 +1211,114 @@ def mesh_as_dictionary(mesh, name=None, include_blend_shapes=True, dump_to_file=
     }
 
     if dump_to_file:
+        write_mesh_dictionary(data_dict, file_name, binary=binary)
+
+    return data_dict
+
+MESH_DICTIONARY_ARRAYS = {
+    "vertex_position_list": np.float64,
+    "polygon_count_list": np.int32,
+    "polygon_connections_list": np.int32,
+    "hard_edge_info": np.int32,
+}
+
+def write_mesh_dictionary(data_dict, file_name, binary=False):
+    """
+    Saves a dictionary made by mesh_as_dictionary to disk. When binary is True, all the vertex, polygon, edge, uv and
+    blend shape arrays are saved to a compressed file_name.npz and only the small info is left in the json. That's a
+    lot smaller and a lot faster to read back in than the same numbers as json text.
+
+    :param data_dict: *dict* from mesh_as_dictionary
+    :param file_name: *string* path of the json file
+    :param binary: *bool* save the arrays as .npz
+    :return: None
+    """
+    if not binary:
+        _write_mesh_json(data_dict, file_name)
+        return
+
+    arrays = {}
+    info_dict = dict(data_dict)
+    for key, dtype in MESH_DICTIONARY_ARRAYS.items():
+        arrays[key] = np.asarray(info_dict.pop(key), dtype=dtype)
+
+    uv_counts, uv_ids = info_dict.pop("assigned_uvs")
+    arrays["uv_counts"] = np.asarray(uv_counts, dtype=np.int32)
+    arrays["uv_ids"] = np.asarray(uv_ids, dtype=np.int32)
+    u_values, v_values = info_dict.pop("uvs")
+    arrays["u_values"] = np.asarray(u_values, dtype=np.float32)
+    arrays["v_values"] = np.asarray(v_values, dtype=np.float32)
+
+    # the json only keeps the names of the blend shape targets, their positions are numbered arrays in the npz
+    blend_shape_names = {}
+    for blend_shape_node_name, blend_shape_info_dict in info_dict.pop("blend_shape").items():
+        blend_shape_names[blend_shape_node_name] = []
+        for blend_shape_target_name, vertex_positions in blend_shape_info_dict.items():
+            array_name = "blend_shape_%s" % len(arrays)
+            arrays[array_name] = np.asarray(vertex_positions, dtype=np.float64)
+            blend_shape_names[blend_shape_node_name].append([blend_shape_target_name, array_name])
+    info_dict["blend_shape"] = blend_shape_names
+
+    np.savez_compressed(file_name + ".npz", **arrays)
+    _write_mesh_json(info_dict, file_name)
+
+def _write_mesh_json(data_dict, file_name):
+    """
+    Writes a mesh dictionary as json. Mesh dictionaries are mostly long lists of numbers, so orjson is used when it's
+    installed since it writes those a lot faster than the json module. Falls back to io_utils.write_json otherwise
+
+    :param data_dict: *dict*
+    :param file_name: *string*
+    :return: None
+    """
+    if orjson is None:
         io_utils.write_json(data_dict, file_name)
+        return
+
+    with open(file_name, "wb") as json_file:
+        json_file.write(orjson.dumps(data_dict, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+
+def _read_mesh_json(file_name):
+    """
+    Reads a mesh dictionary json, with orjson when it's installed
+
+    :param file_name: *string*
+    :return: *dict*
+    """
+    if orjson is None:
+        return io_utils.read_json(file_name)
+
+    with open(file_name, "rb") as json_file:
+        return orjson.loads(json_file.read())
+
+def read_mesh_dictionary(file_name):
+    """
+    Reads a dictionary saved with write_mesh_dictionary (or mesh_as_dictionary's dump_to_file) back in, ready to be
+    passed on to mesh_from_dictionary. Picks up the .npz with the arrays when there is one next to the json.
+
+    :param file_name: *string* path of the json file
+    :return: *dict*
+    """
+    data_dict = _read_mesh_json(file_name)
+    if not os.path.isfile(file_name + ".npz"):
+        return data_dict
+
+    with np.load(file_name + ".npz") as arrays:
+        for key in MESH_DICTIONARY_ARRAYS:
+            data_dict[key] = arrays[key].tolist()
+
+        hard_edge_info = arrays["hard_edge_info"].reshape(-1, 2)
+        data_dict["hard_edge_info"] = [[edge_index, is_smooth] for edge_index, is_smooth in
+                                       zip(hard_edge_info[:, 0].tolist(), hard_edge_info[:, 1].astype(bool).tolist())]
+        data_dict["assigned_uvs"] = (arrays["uv_counts"].tolist(), arrays["uv_ids"].tolist())
+        data_dict["uvs"] = (arrays["u_values"].tolist(), arrays["v_values"].tolist())
+
+        blend_shape_dictionary = {}
+        for blend_shape_node_name, target_names in data_dict.get("blend_shape").items():
+            blend_shape_dictionary[blend_shape_node_name] = {}
+            for blend_shape_target_name, array_name in target_names:
+                blend_shape_dictionary[blend_shape_node_name][blend_shape_target_name] = arrays[array_name].tolist()
+        data_dict["blend_shape"] = blend_shape_dictionary
 
     return data_dict
 
@@ -1014,9 +1331,11 @@ def meshes_from_dictionary(mesh_dict, assign_material=True, center_pivot=True):
     :param center_pivot: *bool* bakes cookies and makes icecream sundaes. Also centers the pivot of the new mesh
     """
     new_meshes = []
-    for mesh_name, info_dict in mesh_dict.items():
-        new_mesh = mesh_from_dictionary(info_dict, assign_material=assign_material, center_pivot=center_pivot)
-        new_meshes.append(new_mesh)
+    with decorators.UndoChunk():
+        for info_dict in mesh_dict.values():
+            new_mesh = _build_mesh(info_dict, _prepare_mesh_data(info_dict), assign_material=assign_material,
+                                   center_pivot=center_pivot)
+            new_meshes.append(new_mesh)
     return new_meshes
 
 
@@ -1031,56 +1350,80 @@ def mesh_from_dictionary(mesh_dict, assign_material=True, mesh_name=None, center
     :param select: *bool* select the new mesh after creating it
     :return: *pynode* of the new mesh
     """
+    with decorators.UndoChunk():
+        return _build_mesh(mesh_dict, _prepare_mesh_data(mesh_dict), assign_material=assign_material,
+                           mesh_name=mesh_name, center_pivot=center_pivot, select=select)
+
+def _prepare_mesh_data(mesh_dict):
+    """
+    Does all the numpy conversions mesh_from_dictionary needs. Nothing in here talks to Maya, so it's safe to run on a
+    worker thread
+
+    :param mesh_dict: <dict>, get it from mesh_as_dictionary
+    :return: *dict* with the float32 vertex positions, the edge numbers and smoothing and the blend shape offsets
+    """
+    base_positions = np.asarray(mesh_dict.get("vertex_position_list"), dtype=np.float64).reshape(-1, 3)
+    hard_edge_info = np.asarray(mesh_dict.get("hard_edge_info"), dtype=np.int32).reshape(-1, 2)
+
+    # the targets are written to the blendShape node as offsets from the base mesh
+    blend_shape_deltas = {}
+    for blend_shape_node_name, blend_shape_info_dict in (mesh_dict.get("blend_shape") or {}).items():
+        blend_shape_deltas[blend_shape_node_name] = [
+            (blend_shape_target_name, np.asarray(vertex_positions, dtype=np.float64).reshape(-1, 3) - base_positions)
+            for blend_shape_target_name, vertex_positions in blend_shape_info_dict.items()]
+
+    return {
+        "float_positions": base_positions.astype(np.float32).tolist(),
+        "edge_numbers": hard_edge_info[:, 0].tolist(),
+        "edge_hardness": hard_edge_info[:, 1].astype(bool).tolist(),
+        "blend_shape_deltas": blend_shape_deltas,
+    }
+
+def _build_mesh(mesh_dict, mesh_data, assign_material=True, mesh_name=None, center_pivot=True, select=True):
+    """
+    Builds the mesh from a dictionary and the data _prepare_mesh_data made from it. Has to run on the main thread
+
+    :param mesh_dict: <dict>, get it from mesh_as_dictionary
+    :param mesh_data: *dict* from _prepare_mesh_data
+    :return: *pynode* of the new mesh
+    """
     from . import blend_shapes as bs
     from . import shader
 
     # Make saved mesh
-    vertex_position_array = om.MFloatPointArray()
-    for vertex_position in mesh_dict.get("vertex_position_list"):
-        vertex_position_array.append(om.MFloatPoint(vertex_position[0], vertex_position[1], vertex_position[2]))
-
     mfn_mesh = om.MFnMesh()
-    mesh_mobject = mfn_mesh.create(vertex_position_array,
+    mesh_mobject = mfn_mesh.create(om.MFloatPointArray(mesh_data["float_positions"]),
                                    mesh_dict.get("polygon_count_list"),
                                    mesh_dict.get("polygon_connections_list")
                                    )
-    mfn_mesh.setUVs(mesh_dict.get("uvs")[0], mesh_dict.get("uvs")[1])
-    mfn_mesh.assignUVs(mesh_dict.get("assigned_uvs")[0], mesh_dict.get("assigned_uvs")[1])
+    u_values, v_values = mesh_dict.get("uvs")
+    mfn_mesh.setUVs(u_values, v_values)
+    uv_counts, uv_ids = mesh_dict.get("assigned_uvs")
+    mfn_mesh.assignUVs(uv_counts, uv_ids)
     new_mesh = pynode(om.MFnDependencyNode(mesh_mobject))
 
     # set hard/soft edges:
-    edge_numbers, edge_hardness = zip(*mesh_dict.get("hard_edge_info"))
-    mfn_mesh.setEdgeSmoothings(edge_numbers, edge_hardness)
+    mfn_mesh.setEdgeSmoothings(mesh_data["edge_numbers"], mesh_data["edge_hardness"])
     mfn_mesh.cleanupEdgeSmoothing()
     mfn_mesh.updateSurface()
 
-    # Add any blend shapes
-    if mesh_dict.get("blend_shape"):
-        for blend_shape_node_name, blend_shape_info_dict in mesh_dict.get("blend_shape").items():
-            for index, (blend_shape_target_name, vertex_positions) in enumerate(blend_shape_info_dict.items()):
-                vertex_position_array = om.MFloatPointArray()
-                for vertex_position in vertex_positions:
-                    vertex_position_array.append(
-                        om.MFloatPoint(vertex_position[0], vertex_position[1], vertex_position[2]))
-
-                mfn_mesh = om.MFnMesh()
-                mesh_mobject = mfn_mesh.create(vertex_position_array,
-                                               mesh_dict.get("polygon_count_list"),
-                                               mesh_dict.get("polygon_connections_list")
-                                               )
-                temp_mesh = pynode(om.MFnDependencyNode(mesh_mobject))
-                pm.rename(temp_mesh, blend_shape_target_name)
-
-                if not blend_shape_node_name in bs.get_blend_shape_nodes(new_mesh):
-                    if pm.objExists(blend_shape_node_name):
-                        warning("The blendShape node %s already exists, outcome may be different than expected" % blend_shape_node_name)
-                    blend_shape_node = pm.createNode("blendShape", name=blend_shape_node_name)
-                    blend_shape_node.setGeometry(new_mesh)
-
-                pm.blendShape(blend_shape_node, edit=True, target=[new_mesh, index, temp_mesh, 1.0])
-                #blend_shape_node.addTarget(new_mesh, index, temp_mesh, 1.0) doesn't work...?
-
-                pm.delete(temp_mesh)
+    # Add any blend shapes, no need to build a temporary mesh with the same topology for every target. The blendShape
+    # nodes on the new mesh are only listed once, the ones made here get added as they're created
+    blend_shape_nodes = {}
+    if mesh_data["blend_shape_deltas"]:
+        blend_shape_nodes = {node.name(): node for node in bs.get_blend_shape_nodes(new_mesh)}
+
+    for blend_shape_node_name, target_deltas in mesh_data["blend_shape_deltas"].items():
+        blend_shape_node = blend_shape_nodes.get(blend_shape_node_name)
+        if blend_shape_node is None:
+            if pm.objExists(blend_shape_node_name):
+                warning("The blendShape node %s already exists, outcome may be different than expected" % blend_shape_node_name)
+            blend_shape_node = pm.createNode("blendShape", name=blend_shape_node_name)
+            blend_shape_node.setGeometry(new_mesh)
+            blend_shape_nodes[blend_shape_node_name] = blend_shape_node
+
+        for index, (blend_shape_target_name, deltas) in enumerate(target_deltas):
+            bs.set_target_deltas(blend_shape_node, index, blend_shape_target_name, deltas)
 
     # assign material
     if assign_material:
@@ -1090,19 +1433,17 @@ def mesh_from_dictionary(mesh_dict, assign_material=True, mesh_name=None, center
             material = pynode(mesh_dict.get("material_name"))
         shader.assign_material(pm.PyNode(new_mesh), material)
 
-    # rename
-    if mesh_name is not None:
-        pm.rename(new_mesh, mesh_name)
-    else:
-        pm.rename(new_mesh, mesh_dict.get("name"))
+    # rename, center the pivots and select straight through cmds on the mesh's path, the PyNode follows the rename
+    if mesh_name is None:
+        mesh_name = mesh_dict.get("name")
+    cmds.rename(new_mesh.longName(), mesh_name)
+    mesh_path = new_mesh.longName()
 
-    # pivots
     if center_pivot:
-        new_mesh.centerPivots()
+        cmds.xform(mesh_path, centerPivots=True)
 
-    # select when done
     if select:
-        pm.select(new_mesh)
+        cmds.select(mesh_path, replace=True)
 
     return new_mesh
 
@@ -1113,12 +1454,7 @@ def get_all_inputs(source):
     :param source: *pynode* node or attribute on node
     :return: recursive list of all inputs into source
     """
-
-    inputs = []
-    for input_node in source.inputs():
-        inputs.append(input_node)
-        inputs += get_all_inputs(input_node)
-    return list(set(inputs))
+    return _walk_connections(source, "inputs")
 
 def get_all_outputs(source):
     """
@@ -1127,12 +1463,30 @@ def get_all_outputs(source):
     :param source: *pynode* node or attribute on node
     :return: recursive list of all outputs into source
     """
+    return _walk_connections(source, "outputs")
 
-    outputs = []
-    for output_node in source.outputs():
-        outputs.append(output_node)
-        outputs += get_all_inputs(output_node)
-    return list(set(outputs))
+def _walk_connections(source, direction):
+    """
+    Walks the connections of source in one direction with a worklist, every node is only visited once no matter how
+    many paths lead to it
+
+    :param source: *pynode* node or attribute on node
+    :param direction: *string* "inputs" or "outputs"
+    :return: *list* of all the nodes found, in the order they were found
+    """
+    found_nodes = []
+    seen_nodes = set()
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        for connected_node in getattr(node, direction)():
+            if connected_node in seen_nodes:
+                continue
+            seen_nodes.add(connected_node)
+            found_nodes.append(connected_node)
+            stack.append(connected_node)
+
+    return found_nodes
 
 def get_component_numbers(components):
     """
@@ -1145,7 +1499,8 @@ def get_component_numbers(components):
         components = [components]
 
     try:
-        return [int(re.search(r"\[([0-9]+)\]", component.name()).group(1)) for component in components]
+        search = COMPONENT_NUMBER_REGEX.search
+        return [int(search(str(component)).group(1)) for component in components]
     except:
         return []
 
@@ -1204,13 +1559,14 @@ def are_siblings(nodes):
     :param nodes: *list*
     :return: *list*
     """
-    parents = []
-    for joint in nodes:
-        parents.append(joint.getParent())
+    node_iterator = iter(nodes)
+    first_node = next(node_iterator, None)
+    if first_node is None:
+        return False
 
-    if len(lists.remove_duplicates(parents)) == 1:
-        return True
-    return False
+    # stop at the first node that has a different parent
+    first_parent = first_node.getParent()
+    return all(node.getParent() == first_parent for node in node_iterator)
 
 def get_siblings(node):
     """
@@ -1254,7 +1610,7 @@ def serialize_matrix(matrix):
     if not type(matrix) == pm.dt.Matrix:
         error(f"{matrix} is not of data type Matrix")
         return
-    return [list(arr) for arr in list(matrix)]
+    return np.asarray(matrix, dtype=np.float64).tolist()
 
 def make_marking_menu():
     pass
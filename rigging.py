@@ -1,3 +1,5 @@
+import numpy as np
+
 import pymel.core as pm
 import maya.cmds as cmds
 
@@ -6,6 +8,42 @@ from utils import lists
 from .constants import jk, tk
 
 
+JOINT_LABELS = {
+    "none": 0,
+    "root": 1,
+    "hip": 2,
+    "knee": 3,
+    "foot": 4,
+    "toe": 5,
+    "spine": 6,
+    "neck": 7,
+    "head": 8,
+    "collar": 9,
+    "shoulder": 10,
+    "elbow": 11,
+    "hand": 12,
+    "finger": 13,
+    "thumb": 14,
+    "propA": 15,
+    "propB": 16,
+    "propC": 17,
+    "other": 18,
+    "index_finger": 19,
+    "middle_finger": 20,
+    "ring_finger": 21,
+    "pinky_finger": 22,
+    "extra_finger": 23,
+    "big_toe": 24,
+    "index_toe": 25,
+    "middle_toe": 27,
+    "pinky_toe": 28,
+    "foot_thumb": 29,
+}
+
+# longest names first, so "index_finger" is found before "finger". Names of the same length keep the last one first,
+# that's the one that used to win when every matching label was set one after the other
+JOINT_LABEL_ITEMS = tuple(sorted(reversed(list(JOINT_LABELS.items())), key=lambda item: len(item[0]), reverse=True))
+
 def label_joints(joints=None, force=False):
     """
     Tries to automatically label joints based on either the Maya naming convention or the name of the joint itself.
@@ -18,42 +56,17 @@ def label_joints(joints=None, force=False):
     if joints is None:
         joints = pm.ls(type="joint")
 
-    label_dict = {}
-    label_dict["none"] = 0
-    label_dict["root"] = 1
-    label_dict["hip"] = 2
-    label_dict["knee"] = 3
-    label_dict["foot"] = 4
-    label_dict["toe"] = 5
-    label_dict["spine"] = 6
-    label_dict["neck"] = 7
-    label_dict["head"] = 8
-    label_dict["collar"] = 9
-    label_dict["shoulder"] = 10
-    label_dict["elbow"] = 11
-    label_dict["hand"] = 12
-    label_dict["finger"] = 13
-    label_dict["thumb"] = 14
-    label_dict["propA"] = 15
-    label_dict["propB"] = 16
-    label_dict["propC"] = 17
-    label_dict["other"] = 18
-    label_dict["index_finger"] = 19
-    label_dict["middle_finger"] = 20
-    label_dict["ring_finger"] = 21
-    label_dict["pinky_finger"] = 22
-    label_dict["extra_finger"] = 23
-    label_dict["big_toe"] = 24
-    label_dict["index_toe"] = 25
-    label_dict["middle_toe"] = 26
-    label_dict["middle_toe"] = 27
-    label_dict["pinky_toe"] = 28
-    label_dict["foot_thumb"] = 29
-
-    for joint in [pm.PyNode(node) for node in joints if general.is_joint(node)]:
+    side_names = None
+    other_type = JOINT_LABELS["other"]
+
+    # PyNodes are used as they are, names go through general.pynode so the PyNode is_joint made is reused
+    joint_nodes = [node if isinstance(node, pm.PyNode) else general.pynode(node)
+                   for node in joints if general.is_joint(node)]
+
+    for joint in joint_nodes:
         if not force:
             # early out if someone has already decorated/labeled this joint
-            if joint.getAttr("type") == label_dict["other"]:
+            if joint.getAttr("type") == other_type:
                 continue
 
         x_pos = joint.getTranslation(space="world")[0]
@@ -63,25 +76,28 @@ def label_joints(joints=None, force=False):
             joint.setAttr("side", 2)
 
         found_name = False
-        for name, value in label_dict.items():
-            if name in joint.name():
+        joint_name = joint.name()
+        for name, value in JOINT_LABEL_ITEMS:
+            if name in joint_name:
                 joint.setAttr("type", value)
                 found_name = True
+                break
 
         if not found_name:
             label_name = joint.nodeName(stripNamespace=True)
 
-            left_names = lists.get_name_variant(["l_", "left_", "_l", "_left", "lft_", "lft_"])
-            right_names = lists.get_name_variant(["r_", "right_", "_r", "_right", "rght_", "_rght"])
+            if side_names is None:
+                side_names = lists.get_name_variant(["l_", "left_", "_l", "_left", "lft_", "lft_"]) + \
+                             lists.get_name_variant(["r_", "right_", "_r", "_right", "rght_", "_rght"])
 
-            for variant in left_names + right_names:
+            for variant in side_names:
                 if label_name.startswith(variant):
                     label_name = label_name[len(variant):]
 
                 if label_name.endswith(variant):
                     label_name = label_name[:-len(variant)]
 
-            joint.setAttr("type", label_dict.get("other"))
+            joint.setAttr("type", other_type)
             joint.setAttr("otherType", label_name)
 
 def get_pole_vector_position(joint_1, joint_2, joint_3, multiplier=1.0):
@@ -96,27 +112,25 @@ def get_pole_vector_position(joint_1, joint_2, joint_3, multiplier=1.0):
     """
     # http://lesterbanks.com/2013/05/calculating-the-position-of-a-pole-vector-in-maya-using-python/
 
-    a = joint_1.getTranslation(space="world")
-    b = joint_2.getTranslation(space="world")
-    c = joint_3.getTranslation(space="world")
+    # plain numpy math on the three positions, so none of the vector operations go through PyMEL
+    a = np.array(joint_1.getTranslation(space="world"), dtype=np.float64)
+    b = np.array(joint_2.getTranslation(space="world"), dtype=np.float64)
+    c = np.array(joint_3.getTranslation(space="world"), dtype=np.float64)
 
     start_to_end = c - a
     start_to_mid = b - a
 
-    dot = start_to_mid * start_to_end
-
-    projection = float(dot) / float(start_to_end.length())
-
-    start_to_end_normalized = start_to_end.normal()
+    start_to_end_length = np.linalg.norm(start_to_end)
+    start_to_end_normalized = start_to_end / start_to_end_length
 
+    projection = np.dot(start_to_mid, start_to_end) / start_to_end_length
     projection_vector = start_to_end_normalized * projection
 
-    arrow_vector = start_to_mid - projection_vector
-    arrow_vector *= multiplier
+    arrow_vector = (start_to_mid - projection_vector) * multiplier
 
     pole_vector_position = arrow_vector + b
 
-    return pole_vector_position
+    return pm.dt.Vector(pole_vector_position.tolist())
 
 def set_joint_draw_style(joints, none=False, bone=False):
     """
@@ -208,9 +222,12 @@ def skeleton_as_dictionary(root_joint, strip_namespace=True):
     root_joint = pm.PyNode(root_joint)
     skeleton_dict_list = []
 
-    joint_hierarchy = general.get_from_list([root_joint] + root_joint.getChildren(allDescendents=True), joints=True)
-    joint_hierarchy = [jnt for jnt in joint_hierarchy if jnt is not None]
-    joint_hierarchy.sort(key=lambda j: len(j.name(long=True)))
+    # sort the long names before making PyNodes, a parent's long name is always shorter than that of its children
+    root_name = root_joint.longName()
+    joint_names = cmds.ls([root_name] + (cmds.listRelatives(root_name, allDescendents=True, fullPath=True) or []),
+                          type="joint", long=True) or []
+    joint_names.sort(key=len)
+    joint_hierarchy = [pm.PyNode(joint_name) for joint_name in joint_names]
 
     for joint in joint_hierarchy:
         skeleton_dict = {}
@@ -244,6 +261,14 @@ def skeleton_from_dictionary(dictionary_list, add_missing_joints=False, node_rem
     dictionary_list.
     :return:
     """
+    # look the joints up in name maps made with one ls call, rather than asking the scene for every joint
+    joints_by_long_name = {}
+    joints_by_short_name = {}
+    for joint_name in cmds.ls(type="joint", long=True) or []:
+        joints_by_long_name[joint_name] = joint_name
+        joints_by_short_name.setdefault(joint_name.rsplit("|", 1)[-1], []).append(joint_name)
+
+    rebuilt_joints = []
     for i, joint_dictionary in enumerate(dictionary_list):
         try:
             long_name = joint_dictionary.get(jk.long_name)
@@ -256,20 +281,26 @@ def skeleton_from_dictionary(dictionary_list, add_missing_joints=False, node_rem
                     jnt_parent = node_remap.get(jnt_parent)
 
             joint = None
-            if pm.objExists(long_name):
-                joint = general.pynode(long_name)
+            if long_name in joints_by_long_name:
+                joint = pm.PyNode(joints_by_long_name[long_name])
             else:
-                found_matches = pm.ls(short_name)
+                found_matches = joints_by_short_name.get(short_name, [])
                 if len(found_matches) == 1:
-                    joint = found_matches[0]
+                    joint = pm.PyNode(found_matches[0])
                 elif len(found_matches) > 1:
                     raise Exception("Found multiple matches for joint : {}. \n Aborting! \n Found matches : {}"
-                                    .format(short_name, [n.name() for n in found_matches]))
+                                    .format(short_name, found_matches))
 
-            if add_missing_joints and not pm.objExists(long_name):
+            if add_missing_joints and long_name not in joints_by_long_name:
                 joint = pm.createNode(pm.nt.Joint, name=short_name)
                 pm.parent(joint, jnt_parent)
 
+                # the children of this joint look for it by the long name it got from its parent
+                joint_name = joint.longName()
+                joints_by_long_name[long_name] = joint_name
+                joints_by_long_name[joint_name] = joint_name
+                joints_by_short_name.setdefault(joint.nodeName(), []).append(joint_name)
+
             # didn't create a joint, and couldn't find it, skip
             if not joint:
                 pm.warning(f"Found no match for joint, and not creating it: {short_name}")
@@ -287,12 +318,13 @@ def skeleton_from_dictionary(dictionary_list, add_missing_joints=False, node_rem
             else:
                 joint.setMatrix(joint_dictionary.get(tk.local_matrix), objectSpace=True)
             joint.visibility.set(joint_dictionary.get(tk.visibility))
+            rebuilt_joints.append(joint)
         except Exception as err:
             print(err)
             pass
 
     pm.select(None)
-    label_joints(pm.ls(type=pm.nt.Joint))
+    label_joints(rebuilt_joints)
 
 def create_wrap(*args, **kwargs):
     """
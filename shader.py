@@ -1,4 +1,5 @@
 import pymel.core as pm
+import maya.cmds as cmds
 
 def delete_unused_shading_nodes():
     """
@@ -18,15 +19,23 @@ def get_materials(objects):
     if not isinstance(objects, list):
         objects = [objects]
 
-    all_materials = []
+    # the shapes of all the objects, and the shading engines of all those shapes, each in one query
+    object_names = [str(obj) for obj in objects]
+    shape_nodes = cmds.listRelatives(object_names, shapes=True, noIntermediate=True, fullPath=True) or []
+    shape_nodes += cmds.ls(object_names, shapes=True, long=True) or []
+    if not shape_nodes:
+        return []
 
-    for obj in objects:
-        obj = pm.PyNode(obj)
-        shape_node = obj.getShape()
-        shading_engines = shape_node.listConnections(type="shadingEngine")
-        all_materials += pm.ls(pm.listConnections(shading_engines), materials=True)
+    shading_engines = cmds.listConnections(shape_nodes, type="shadingEngine", source=False, destination=True) or []
+    if not shading_engines:
+        return []
 
-    return all_materials
+    # only follow what is plugged into the surface shader, rather than every connection of the shading engines
+    surface_shader_plugs = ["%s.surfaceShader" % shading_engine for shading_engine in dict.fromkeys(shading_engines)]
+    materials = cmds.ls(cmds.listConnections(surface_shader_plugs, source=True, destination=False) or [],
+                        materials=True) or []
+
+    return [pm.PyNode(material) for material in dict.fromkeys(materials)]
 
 def create_texture(name, file_path, place_2d_name=None):
     """
@@ -93,14 +102,17 @@ def assign_material(mesh, material):
     :param material:
     :return:
     """
-    mesh = pm.PyNode(mesh)
-    material = pm.PyNode(material)
-    shading_group = pm.PyNode(material).listConnections(type="shadingEngine")[0]
+    if not isinstance(mesh, pm.PyNode):
+        mesh = pm.PyNode(mesh)
+    if not isinstance(material, pm.PyNode):
+        material = pm.PyNode(material)
 
     if material.name() == "lambert1":
         shading_group = pm.PyNode("initialShadingGroup")
+    else:
+        shading_group = material.listConnections(type="shadingEngine")[0]
 
-    if pm.PyNode(mesh).__class__ == pm.nodetypes.Transform:
+    if isinstance(mesh, pm.nodetypes.Transform):
         mesh = mesh.getShape()
 
     pm.sets(shading_group, edit=True, forceElement=mesh)
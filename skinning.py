@@ -1,5 +1,7 @@
 import traceback
 
+import numpy as np
+
 import pymel.core as pm
 import maya.cmds as cmds
 import maya.OpenMaya as om
@@ -7,6 +9,7 @@ from maya import OpenMayaUI as omui
 
 import maya.api.OpenMaya as newOM
 import maya.api.OpenMayaUI as newOMUI
+import maya.api.OpenMayaAnim as newOMA
 
 from utils import io_utils
 from utils import decorators
@@ -17,12 +20,10 @@ from . import ui as mui
 
 import os
 import tempfile
+import zipfile
 from functools import partial
 from collections import OrderedDict
 
-import sys
-PY3 = sys.version_info.major > 2
-
 
 def hard_skin_to_single_joint(mesh, joint, remove_unused_influences=True):
     """
@@ -72,10 +73,7 @@ def copy_skin(source_mesh, target_mesh, method=["label", "oneToOne", "closestJoi
         source_skin = get_skin_cluster_from_mesh(source_mesh)
         target_skin = general.pynode(pm.skinCluster(source_skin.influenceObjects(), target_mesh, toSelectedBones=True))
 
-    influencing_joints = source_skin.getInfluence()
-
-    for joint in influencing_joints:
-        add_joint_to_skin_cluster(joint, target_skin)
+    add_joints_to_skin_cluster(source_skin.getInfluence(), target_skin)
 
     if type(source_uv_set_name) == str and type(target_uv_set_name) == str:
         pm.copySkinWeights(sourceSkin=source_skin.name(), destinationSkin = target_skin.name(), uvSpace=[source_uv_set_name, target_uv_set_name], noMirror=True, influenceAssociation=method, smooth=smooth)
@@ -90,10 +88,46 @@ def add_joint_to_skin_cluster(joint, skin_cluster):
     :param skin_cluster: name of the skinCluster, you can use getSkinClusterFromMesh or getSkinClusterFromComponent for this
     :return: None
     """
-    if not joint in pm.skinCluster(skin_cluster, query=True, influence=True):
+    if not is_influence_of(joint, skin_cluster):
         pm.skinCluster(skin_cluster, edit=True, addInfluence=joint, weight=0, lockWeights=True)
         pm.setAttr("%s.liw" % joint, False)
 
+def add_joints_to_skin_cluster(joints, skin_cluster):
+    """
+    Adds all the joints that aren't an influence of the skinCluster yet in one go. The influences of the skinCluster
+    only get listed once, instead of once per joint like add_joint_to_skin_cluster in a loop would
+
+    :param joints: <list> of <string> or <pynode> joints you want to add
+    :param skin_cluster: name of the skinCluster, you can use getSkinClusterFromMesh or getSkinClusterFromComponent for this
+    :return: <list> of long names of the joints that were added
+    """
+    existing_influences = set(cmds.ls(cmds.skinCluster(str(skin_cluster), query=True, influence=True) or [], long=True))
+
+    missing_joints = []
+    for joint in cmds.ls([str(joint) for joint in joints], long=True):
+        if joint not in existing_influences and joint not in missing_joints:
+            missing_joints.append(joint)
+
+    if missing_joints:
+        cmds.skinCluster(str(skin_cluster), edit=True, addInfluence=missing_joints, weight=0, lockWeights=True)
+        for joint in missing_joints:
+            cmds.setAttr("%s.liw" % joint, False)
+
+    return missing_joints
+
+def is_influence_of(joint, skin_cluster):
+    """
+    True if joint is an influence of skin_cluster. Rather than listing every influence of the skinCluster, this only
+    looks at which skinClusters the worldMatrix of the joint is plugged into
+
+    :param joint: <string> or <pynode> of the joint
+    :param skin_cluster: <string> or <pynode> of the skinCluster
+    :return: <bool>
+    """
+    skin_clusters = cmds.listConnections("%s.worldMatrix" % joint, type="skinCluster", source=False,
+                                         destination=True) or []
+    return str(skin_cluster) in skin_clusters
+
 def get_skin_cluster_from_mesh(mesh):
     """
     Gives you the skinCluster attached to this mesh.
@@ -101,10 +135,22 @@ def get_skin_cluster_from_mesh(mesh):
     :param mesh: <string> or <pynode> of the mesh
     :return: the skinCluster or None, if it doesn't have one
     """
-    node = pm.PyNode(mesh)
     try:
-        skinCluster = node.listHistory(type="skinCluster")[0]
-        return skinCluster
+        selection_list = newOM.MSelectionList()
+        selection_list.add(str(mesh))
+        node = selection_list.getDependNode(0)
+        if node.hasFn(newOM.MFn.kTransform):
+            node = selection_list.getDagPath(0).extendToShape().node()
+
+        # walks upstream from the shape and stops at the first skinCluster, instead of listing all of its history
+        iterator = newOM.MItDependencyGraph(node, newOM.MFn.kSkinClusterFilter,
+                                            newOM.MItDependencyGraph.kUpstream,
+                                            newOM.MItDependencyGraph.kBreadthFirst,
+                                            newOM.MItDependencyGraph.kNodeLevel)
+        if iterator.isDone():
+            return None
+
+        return general.pynode(newOM.MFnDependencyNode(iterator.currentNode()).name())
     except:
         return None
 
@@ -230,22 +276,17 @@ def set_soft_select_weights():
 
         print("Replacing weights for %i vertices" % len(vertex_numbers))
 
-        for index, vertex_number in enumerate(vertex_numbers):
-            # get the list of weights for this particular vertex
-            weights_list_for_this_vertex = skin_info.get_weight_list_of_vertex(vertex_number)
-            # replace the value in the list of weights at the location of the joint we have selected
-            # with the value that we found using get_soft_selection_weights()
-            weights_list_for_this_vertex[new_joint_index] = soft_select_weights[index]
-            weights_list_for_this_vertex = normalize(weights_list_for_this_vertex, new_joint_index)
+        # all the weights as one (vertices, influences) array, so every soft selected vertex is done in one go
+        weights = skin_info.weights.copy()
+        rows = np.array(vertex_numbers, dtype=np.int64)
 
-            # replace the weights list for this particular vertex with the normalized weights
-            skin_info.set_weights_list_of_vertex(vertex_number, weights_list_for_this_vertex)
-            # skin_info.skin_info_dict.get("weight_dict")[str(vertex_number)] = normalized_weights_list
+        # put the soft selection weights on the selected joint, then scale the other influences of those vertices so
+        # everything adds up to 1 again
+        weights[rows, new_joint_index] = soft_select_weights
+        weights[rows] = normalize_rows(weights[rows], new_joint_index)
 
-        # grab the complete weightlist from our SkinInfo class and dump it into the selected mesh's skinCluster
-        complete_weights_list = skin_info.get_complete_weights_list()
-        # skin_info.set_weights(complete_weights_list, normalize=True)
-        skin_info.set_weights(complete_weights_list)
+        # dump the complete weights into the selected mesh's skinCluster
+        skin_info.set_weights(weights)
 
         pm.select(None)
 
@@ -274,13 +315,27 @@ def normalize(values, unchanged_index=0):
     :param unchanged_index: *int* index of the value you don't want to change when normalizing
     :return: *list* of floats that all add up to 1
     """
-    remaining = 1 - values[unchanged_index]
-    total_except_remaining = sum(values) - values[unchanged_index]
-    if not total_except_remaining == 0:
-        return [(value * remaining / total_except_remaining if idx != unchanged_index else value)
-                for idx, value in enumerate(values)]
-    else:
-        return [(value * remaining if idx != unchanged_index else value) for idx, value in enumerate(values)]
+    return normalize_rows(np.array([values], dtype=np.float64), unchanged_index)[0].tolist()
+
+def normalize_rows(weights, unchanged_index=0):
+    """
+    Does what normalize() does for every row of a (rows, influences) array at once: scales all the values in a row,
+    except the one at unchanged_index, so the row adds up to 1. The array is changed in place.
+
+    :param weights: <numpy.ndarray> of shape (rows, influences)
+    :param unchanged_index: *int* column of the value you don't want to change when normalizing
+    :return: <numpy.ndarray> weights
+    """
+    unchanged_values = weights[:, unchanged_index].copy()
+    remaining = 1.0 - unchanged_values
+    total_except_remaining = weights.sum(axis=1) - unchanged_values
+
+    # rows that have nothing but the unchanged value get scaled by the remaining value on its own, like normalize does
+    scale = np.divide(remaining, total_except_remaining, out=remaining.copy(), where=total_except_remaining != 0)
+    weights *= scale[:, None]
+    weights[:, unchanged_index] = unchanged_values
+
+    return weights
 
 def user_is_skinning():
     """
@@ -330,18 +385,18 @@ def paste_weights():
     selection = pm.selected()
     temp_file = os.path.join(tempfile.gettempdir(), "weights")
     saved_joints = io_utils.read_json(temp_file)
-    mesh = general.get_transform_from_shape(general.pynode(pm.selected()[0].name().split(".")[0]))
+    # every selected component is on the same mesh, so its name only needs to be looked up once
+    mesh_name = selection[0].name().split(".")[0]
+    mesh = general.get_transform_from_shape(general.pynode(mesh_name))
 
-    skin_cluster = get_skin_cluster_from_component(general.flatten_component_list(pm.selected())[0])
+    skin_cluster = get_skin_cluster_from_mesh(mesh_name)
 
     if skin_cluster is None:
         skin_cluster = pm.skinCluster(saved_joints, mesh, toSelectedBones=True)
 
-    for joint in saved_joints:
-        add_joint_to_skin_cluster(general.pynode(joint), skin_cluster)
+    add_joints_to_skin_cluster(saved_joints, skin_cluster)
 
     pm.select(selection)
-    pm.polyListComponentConversion(pm.selected(), toVertex=True)
     try:
         pm.mel.eval("PasteVertexWeights;")
     except:
@@ -402,12 +457,82 @@ def enter_joint_placement(post_creation_func=None):
     if pm.draggerContext(dragger_context, exists=True):
         pm.deleteUI(dragger_context)
     pm.draggerContext(dragger_context, name=dragger_context, cursor='crossHair',
-                      releaseCommand=partial(place_joint, dragger_context, target_meshes, post_creation_func),
+                      releaseCommand=partial(place_joint, dragger_context, target_meshes, post_creation_func,
+                                             bounding_boxes=get_world_bounding_boxes(target_meshes),
+                                             mesh_function_sets=get_mesh_function_sets(target_meshes)),
                       drawString="Middle mouse to end placing")
     pm.setToolTo(dragger_context)
 
 
-def place_joint(dragger_context, target_meshes, post_creation_func=None):
+def get_mesh_function_sets(meshes, api_2=False):
+    """
+    Returns an MFnMesh for every mesh, so tools that ray cast against the same meshes on every mouse event only have
+    to look them up once
+
+    :param meshes: <list> of <pynode> meshes
+    :param api_2: <bool> return maya.api.OpenMaya function sets instead of maya.OpenMaya ones
+    :return: <list> of MFnMesh
+    """
+    mesh_function_sets = []
+    for mesh in meshes:
+        if api_2:
+            selection_list = newOM.MSelectionList()
+            selection_list.add(mesh.name())
+            mesh_function_sets.append(newOM.MFnMesh(selection_list.getDagPath(0)))
+        else:
+            selection_list = om.MSelectionList()
+            selection_list.add(mesh.name())
+            dag_path = om.MDagPath()
+            selection_list.getDagPath(0, dag_path)
+            mesh_function_sets.append(om.MFnMesh(dag_path))
+
+    return mesh_function_sets
+
+def get_world_bounding_boxes(meshes):
+    """
+    Returns the world space bounding box of every mesh, as a (min, max) tuple of two (x, y, z) tuples
+
+    :param meshes: <list> of <pynode> meshes
+    :return: <list> of tuples
+    """
+    bounding_boxes = []
+    for mesh in meshes:
+        x_min, y_min, z_min, x_max, y_max, z_max = cmds.exactWorldBoundingBox(str(mesh))
+        bounding_boxes.append(((x_min, y_min, z_min), (x_max, y_max, z_max)))
+
+    return bounding_boxes
+
+def ray_hits_bounding_box(origin, direction, bounding_box):
+    """
+    Slab test of a ray against a bounding box. A lot cheaper than an intersection test against the mesh inside of it,
+    so use this to skip the meshes the ray can't possibly hit
+
+    :param origin: point with x, y and z
+    :param direction: vector with x, y and z
+    :param bounding_box: (min, max) tuple, see get_world_bounding_boxes
+    :return: <bool>
+    """
+    box_min, box_max = bounding_box
+    t_enter = float("-inf")
+    t_exit = float("inf")
+    for ray_origin, ray_direction, slab_min, slab_max in zip((origin.x, origin.y, origin.z),
+                                                             (direction.x, direction.y, direction.z),
+                                                             box_min, box_max):
+        if ray_direction == 0:
+            if ray_origin < slab_min or ray_origin > slab_max:
+                return False
+            continue
+
+        t_1 = (slab_min - ray_origin) / ray_direction
+        t_2 = (slab_max - ray_origin) / ray_direction
+        t_enter = max(t_enter, min(t_1, t_2))
+        t_exit = min(t_exit, max(t_1, t_2))
+        if t_enter > t_exit:
+            return False
+
+    return t_exit >= 0
+
+def place_joint(dragger_context, target_meshes, post_creation_func=None, bounding_boxes=None, mesh_function_sets=None):
     global placed_joints
 
     modifier = pm.draggerContext(dragger_context, query=True, modifier=True)
@@ -425,14 +550,13 @@ def place_joint(dragger_context, target_meshes, post_creation_func=None):
     hit_positions = []
 
     if mouse_button == 1:
-        clicked_meshes = {}
-        for mesh in target_meshes:
-            selectionList = om.MSelectionList()
-            selectionList.add(mesh.name())
-            dagPath = om.MDagPath()
-            selectionList.getDagPath(0, dagPath)
+        if mesh_function_sets is None:
+            mesh_function_sets = get_mesh_function_sets(target_meshes)
 
-            fn_mesh = om.MFnMesh(dagPath)
+        clicked_meshes = {}
+        for index, (mesh, fn_mesh) in enumerate(zip(target_meshes, mesh_function_sets)):
+            if bounding_boxes is not None and not ray_hits_bounding_box(position, direction, bounding_boxes[index]):
+                continue
 
             clicked_on_mesh = fn_mesh.closestIntersection(
                 om.MFloatPoint(position), om.MFloatVector(direction),
@@ -444,8 +568,12 @@ def place_joint(dragger_context, target_meshes, post_creation_func=None):
                 hit_positions.append(hit_pos)
                 clicked_meshes[hit_pos] = mesh.name()
 
-        hit_positions.sort(key=lambda p: camera_position.distanceTo(pm.datatypes.Vector(p)))
-        hit_pos = hit_positions[0]
+        if not hit_positions:
+            return
+
+        # only the hit closest to the camera matters, no need to sort all of them
+        offsets = np.array(hit_positions, dtype=np.float64) - np.array(camera_position, dtype=np.float64)
+        hit_pos = hit_positions[int(np.argmin(np.einsum("ij,ij->i", offsets, offsets)))]
         if not pm.optionVar.get("JointPlacer_FirstClickedMesh"):
             pm.optionVar["JointPlacer_FirstClickedMesh"] = clicked_meshes.get(hit_pos)
             print(f"Setting JointPlacement mesh to: {clicked_meshes.get(hit_pos)}")
@@ -511,7 +639,9 @@ def enter_hammer_tool():
 
     :return:
     """
-    def hammer(dragger_context, target_meshes):
+    last_hammered = {"components": None}
+
+    def hammer(dragger_context, target_meshes, bounding_boxes, mesh_function_sets):
         with pm.UndoChunk():
             screen_x, screen_Y, _ = pm.draggerContext(dragger_context, query=True, dragPoint=True)
             modifier = pm.draggerContext(dragger_context, query=True, modifier=True)
@@ -528,10 +658,9 @@ def enter_hammer_tool():
             # list that holds the hitpoint, reference to the mesh and reference to closest face to the point
             point_mesh_face_list = []
 
-            for mesh in target_meshes:
-                selection_list = newOM.MSelectionList()
-                selection_list.add(mesh.name())
-                fn_mesh = newOM.MFnMesh(selection_list.getDagPath(0))
+            for index, (mesh, fn_mesh) in enumerate(zip(target_meshes, mesh_function_sets)):
+                if not ray_hits_bounding_box(position, direction, bounding_boxes[index]):
+                    continue
 
                 # hitpoint, hitrayparam, hit_face, hit_triangle, hit_bary1, hit_bar2
                 ray_result = fn_mesh.closestIntersection(newOM.MFloatPoint(position),
@@ -547,36 +676,43 @@ def enter_hammer_tool():
                     point_mesh_face_list.append([hit_point, mesh, hit_face, fn_mesh])
 
             if len(point_mesh_face_list) > 0:
-                point_mesh_face_list.sort(
-                    key=lambda p: camera_position.distanceTo(pm.dt.Vector(p[0].x, p[0].y, p[0].z)))
+                hit_points = np.array([(p[0].x, p[0].y, p[0].z) for p in point_mesh_face_list], dtype=np.float64)
+                offsets = hit_points - np.array(camera_position, dtype=np.float64)
 
-                closest = point_mesh_face_list[0]
+                closest = point_mesh_face_list[int(np.argmin(np.einsum("ij,ij->i", offsets, offsets)))]
                 closest_hitpoint = closest[0]
                 closest_mesh = closest[1]
                 closest_face = closest[2]
                 closest_fn_mesh = closest[3]
 
-                if modifier == "shift":
-                    vertices = [general.pynode("%s.vtx[%s]" % (closest_mesh.name(), vtx)) for vtx in closest_fn_mesh.getPolygonVertices(closest_face)]
-                    vertices.sort(key=lambda vtx: general.mpoint_to_vector(vtx.getPosition(space="world")).distanceTo(
-                        general.mpoint_to_vector(closest_hitpoint)))
-                    pm.select(vertices[0])
-                elif modifier == "ctrl":
-                    pass
-                    edges = [general.pynode("%s.e[%s]" % (closest_mesh.name(), edge)) for edge in general.pynode("%s.f[%s]" % (closest_mesh.name(), closest_face)).getEdges()]
-                    edge_vertices = []
-                    for edge in edges:
-                        edge_vertices.extend(edge.connectedVertices())
-
-                    edge_vertices.sort(key=lambda vtx: general.mpoint_to_vector(vtx.getPosition(space="world")).distanceTo(
-                        general.mpoint_to_vector(closest_hitpoint)))
-                    pm.select(edge_vertices[0], edge_vertices[1])
+                if modifier in ("shift", "ctrl"):
+                    # shift hammers the vertex of the face closest to the hit point, ctrl the two closest ones
+                    face_vertices = np.array(closest_fn_mesh.getPolygonVertices(closest_face), dtype=np.int64)
+                    face_points = np.array([(point.x, point.y, point.z) for point in
+                                            (closest_fn_mesh.getPoint(int(vertex), newOM.MSpace.kWorld)
+                                             for vertex in face_vertices)], dtype=np.float64)
+                    offsets = face_points - (closest_hitpoint.x, closest_hitpoint.y, closest_hitpoint.z)
+                    closest_vertices = face_vertices[np.argsort(np.einsum("ij,ij->i", offsets, offsets))]
+
+                    number_of_vertices = 1 if modifier == "shift" else 2
+                    components = ["%s.vtx[%s]" % (closest_mesh.name(), vertex)
+                                  for vertex in closest_vertices[:number_of_vertices]]
                 else:
-                    pm.select("%s.f[%s]" % (closest_mesh.name(), closest_face))
+                    components = ["%s.f[%s]" % (closest_mesh.name(), closest_face)]
+
+                # dragging inside the same face fires a lot of events, there's no point hammering it again
+                if components == last_hammered["components"]:
+                    return
+                last_hammered["components"] = components
 
-            pm.mel.WeightHammer()
-            pm.refresh(force=True)
-            pm.select(None)
+                pm.select(components)
+                pm.mel.WeightHammer()
+                pm.select(None)
+
+    def end_hammer():
+        # the viewport only needs to catch up once, when the drag is done
+        last_hammered["components"] = None
+        pm.refresh(force=True)
 
 
     target_meshes = general.get_all_visibile_meshes(as_transforms=True)
@@ -585,7 +721,10 @@ def enter_hammer_tool():
     if pm.draggerContext(dragger_context, exists=True):
         pm.deleteUI(dragger_context)
     pm.draggerContext(dragger_context, name=dragger_context, cursor='crossHair',
-                      dragCommand=partial(hammer, dragger_context, target_meshes))
+                      dragCommand=partial(hammer, dragger_context, target_meshes,
+                                          get_world_bounding_boxes(target_meshes),
+                                          get_mesh_function_sets(target_meshes, api_2=True)),
+                      releaseCommand=end_hammer)
     pm.setToolTo(dragger_context)
 
 def get_minimal_skeleton(meshes, root_joint_name="root", return_unused_joints=False, always_include_joints=[]):
@@ -635,20 +774,21 @@ class SkinInfo(object):
         Builds a skin info object for a given mesh. This skin info object can be used to save/load skinweights, transfer
         weights between influences and set the weights for a skincluster. Saving/Loading is extremly fast.
 
+        The weights are kept in self.weights, a (number of vertices, number of influences) float32 numpy array that is
+        read from and written to the skinCluster with MFnSkinCluster in one call. The skinCluster itself stores doubles,
+        the weights only get converted to those when they're written.
+
         :param mesh: <string> or <pynode> of a mesh
         """
         super(SkinInfo, self).__init__()
         self.mesh = pm.PyNode(mesh)
+        self.weights = None
         self.reinitialize()
 
     def __get_skin_info_dict(self):
         skin_info_dict = OrderedDict()
 
-        if is_skinned(self.mesh):
-            skin_info_dict["weight_dict"] = OrderedDict()
-            for vertex_index, influence_list in enumerate(zip(self.skin_cluster.getWeights(self.mesh))):
-                skin_info_dict["weight_dict"][str(vertex_index)] = list(influence_list[0]) # making the key a str because JSON needs it
-
+        if self.skin_cluster is not None:
             skin_info_dict["mesh_name"] = self.mesh.name()
             skin_info_dict["vertex_positions"] = general.get_vertex_pos_of_mesh(self.mesh)
             skin_info_dict["influence_list"] = self.influence_list
@@ -656,18 +796,49 @@ class SkinInfo(object):
 
         return skin_info_dict
 
-    def __get_influence_list(self):
+    def __bind_influences(self):
+        """
+        Queries the influences of the skinCluster once and keeps them, together with the list of influence indices and
+        a long name to index lookup for get_index_of_joint
+
+        :return: None
+        """
+        self.influence_objects = self.skin_cluster.influenceObjects() if self.skin_cluster is not None else []
+        self.influence_list = list(range(len(self.influence_objects)))
+        self.influence_indices = {joint.longName(): index for index, joint in enumerate(self.influence_objects)}
+
+    def __get_skin_cluster_function_set(self):
+        """
+        Returns the API 2.0 function set of the skinCluster, the dag path of the mesh it deforms and a component that
+        holds every vertex of that mesh, which is what MFnSkinCluster.getWeights and setWeights need
+
+        :return: <MFnSkinCluster>, <MDagPath>, <MObject>
+        """
+        selection_list = newOM.MSelectionList()
+        selection_list.add(self.skin_cluster.name())
+        fn_skin_cluster = newOMA.MFnSkinCluster(selection_list.getDependNode(0))
+
+        dag_path = fn_skin_cluster.getPathAtIndex(0)
+        fn_component = newOM.MFnSingleIndexedComponent()
+        components = fn_component.create(newOM.MFn.kMeshVertComponent)
+        fn_component.setCompleteData(newOM.MFnMesh(dag_path).numVertices)
+
+        return fn_skin_cluster, dag_path, components
+
+    def __get_weights(self):
         """
-        Get a list of integers counting from 0 to the number of influences in the mesh's skin cluster
+        Reads all the weights of the skinCluster in one MFnSkinCluster.getWeights call
 
-        :return:
+        :return: <numpy.ndarray> of shape (number of vertices, number of influences)
         """
-        influence_list = []
-        if is_skinned(self.mesh):
-            for x in range(len(self.skin_cluster.influenceObjects())):
-                influence_list.append(x)
+        if self.skin_cluster is None:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        fn_skin_cluster, dag_path, components = self.__get_skin_cluster_function_set()
+        # the doubles the skinCluster stores, cast down to float32 only here
+        weights, number_of_influences = fn_skin_cluster.getWeights(dag_path, components)
 
-        return influence_list
+        return np.array(weights, dtype=np.float32).reshape(-1, number_of_influences)
 
     @decorators.timeit
     def get_complete_weights_list(self):
@@ -684,54 +855,148 @@ class SkinInfo(object):
 
         :return: <list> of floats
         """
-        complete_weights_list = []
-        for _, influence_values in self.skin_info_dict.get("weight_dict").items():
-            if len(influence_values) < 2:
-                influence_values = [influence_values]
-            complete_weights_list.extend(influence_values)
-
-
-        return complete_weights_list
+        return self.weights.ravel().tolist()
 
     @decorators.timeit
     def set_weights(self, weights_list, normalize=True):
-        self.skin_cluster.setWeights(self.mesh, self.influence_list, weights_list, normalize=normalize)
+        """
+        Sets all the weights of the skinCluster
+
+        :param weights_list: flat <list> of floats like get_complete_weights_list returns, or a (vertices, influences)
+        <numpy.ndarray> like self.weights
+        :param normalize: <bool> normalize the weights of every vertex
+        :return: None
+        """
+        # the skinCluster works in doubles. self.weights gets a float32 copy of what it stores afterwards, never of a
+        # locally computed guess
+        weights = np.array(weights_list, dtype=np.float64).reshape(-1, len(self.influence_list))
+
+        fn_skin_cluster, dag_path, components = self.__get_skin_cluster_function_set()
+        fn_skin_cluster.setWeights(dag_path, components, newOM.MIntArray(self.influence_list),
+                                   newOM.MDoubleArray(weights.ravel().tolist()), normalize)
         if normalize:
             pm.skinCluster(self.skin_cluster, edit=True, forceNormalizeWeights=True)
-        self.reinitialize()
+            # normalizing skips locked influences and follows the normalizeWeights mode and maxInfluences of the
+            # skinCluster, so read back what it ended up storing instead of guessing
+            self.weights = self.__get_weights()
+        else:
+            # nothing changed the weights on the way in, no need to read them all back from the skinCluster
+            self.weights = weights.astype(np.float32)
 
     def get_index_of_joint(self, joint):
+        """
+        Index of the joint in the influences of the skinCluster. Adds the joint to the skinCluster if it isn't an
+        influence yet
+
+        :param joint: <string> or <pynode> of the joint
+        :return: <int>
+        """
         joint = pm.PyNode(joint)
-        try:
-            return self.skin_cluster.influenceObjects().index(joint)
-            # return self.skin_cluster.indexForInfluenceObject(joint) #this was giving me weird results...?
-        except:
+        index = self.influence_indices.get(joint.longName())
+        if index is None:
             add_joint_to_skin_cluster(joint, self.skin_cluster)
+            # the new influence adds a column to the weights, so those need to be read again too
             self.reinitialize()
-        finally:
-            return self.skin_cluster.influenceObjects().index(joint)
+            index = self.influence_indices[joint.longName()]
+
+        return index
 
     def reinitialize(self):
+        self.__bind_skin_cluster()
+        self.weights = self.__get_weights()
+
+    def __bind_skin_cluster(self):
+        """
+        Looks the skinCluster of the mesh and its influences up again, without reading the weights
+
+        :return: None
+        """
         self.skin_cluster = get_skin_cluster_from_mesh(self.mesh)
 
-        self.influence_list = self.__get_influence_list()
+        self.__bind_influences()
         self.skin_info_dict = self.__get_skin_info_dict()
 
     def get_influence_objects(self):
-        return self.skin_cluster.influenceObjects()
+        return self.influence_objects
+
+    def __get_file_dict(self):
+        """
+        The skin_info_dict with the weights added as a "weight_dict" of vertex number (as a string, because JSON needs
+        it) to the list of weights of that vertex. That's the layout the skin files have always been saved in
+
+        :return: <OrderedDict>
+        """
+        file_dict = OrderedDict(self.skin_info_dict)
+        # the string keys only get made here, when writing json, everywhere else it's the rows of self.weights
+        # rounded, so the float32 weights don't show up as 0.30000001192092896 in the file
+        weight_rows = np.round(self.weights.astype(np.float64), 7).tolist()
+        file_dict["weight_dict"] = OrderedDict(zip(map(str, range(len(weight_rows))), weight_rows))
+
+        return file_dict
 
     def save_skin_to_file(self, filename, binary=False):
+        """
+        Saves the skinning to a file. The binary version is a compressed numpy .npz with the weights as one array,
+        the json version has a weight_dict with the weights of every vertex
+
+        :param filename: <string> path of the file, used as it is (no extension gets added)
+        :param binary: <bool>
+        :return: None
+        """
         if binary:
-            io_utils.write_pickle(self.skin_info_dict, filename)
+            # write through a file object, np.savez_compressed would add .npz to a file name
+            with open(filename, "wb") as skin_file:
+                np.savez_compressed(skin_file,
+                                    weights=self.weights,
+                                    # always plain str arrays, object arrays can't be loaded without pickle
+                                    mesh_name=np.array(self.skin_info_dict.get("mesh_name") or "", dtype=str),
+                                    vertex_positions=np.asarray(self.skin_info_dict.get("vertex_positions") or [],
+                                                                dtype=np.float64),
+                                    influence_list=np.asarray(self.influence_list, dtype=np.int64),
+                                    influence_names=np.array(self.skin_info_dict.get("influence_names") or [],
+                                                             dtype=str))
         else:
-            io_utils.write_json(self.skin_info_dict, filename)
+            io_utils.write_json(self.__get_file_dict(), filename)
+
+    def __read_binary_skin_file(self, filename):
+        """
+        Reads a binary skin file into skin_info_dict and weights. Files saved before the .npz format are pickled
+        dictionaries, those still load.
+
+        :param filename: <string>
+        :return: None
+        """
+        if not zipfile.is_zipfile(filename):
+            self.skin_info_dict = io_utils.read_pickle(filename)
+            self.__set_weights_from_weight_dict(self.skin_info_dict.pop("weight_dict"))
+            return
+
+        with np.load(filename) as skin_file:
+            self.weights = skin_file["weights"].astype(np.float32)
+
+            self.skin_info_dict = OrderedDict()
+            # an empty name or list means it wasn't there when the file got saved
+            self.skin_info_dict["mesh_name"] = str(skin_file["mesh_name"]) or None
+            self.skin_info_dict["vertex_positions"] = skin_file["vertex_positions"].tolist()
+            self.skin_info_dict["influence_list"] = skin_file["influence_list"].tolist()
+            self.skin_info_dict["influence_names"] = skin_file["influence_names"].tolist() or None
+
+    def __set_weights_from_weight_dict(self, weight_dict):
+        """
+        Fills self.weights from a weight_dict like the ones in the json skin files
+
+        :param weight_dict: <dict> of vertex number to a list of weights
+        :return: None
+        """
+        self.weights = np.array(list(weight_dict.values()), dtype=np.float32).reshape(len(weight_dict), -1)
 
     @decorators.timeit
     def load_skin_from_file(self, filename, binary=False):
         if binary:
-            self.skin_info_dict = io_utils.read_pickle(filename)
+            self.__read_binary_skin_file(filename)
         else:
             self.skin_info_dict = io_utils.read_json(filename, ordered_dict=True)
+            self.__set_weights_from_weight_dict(self.skin_info_dict.pop("weight_dict"))
 
         if not is_skinned(self.mesh):
             joints = self.skin_info_dict.get("influence_names")
@@ -739,19 +1004,26 @@ class SkinInfo(object):
                 joints = general.get_from_list(pm.ls(), joints=True)
             skin_cluster_name = pm.skinCluster(joints, self.mesh, toSelectedBones=True, maximumInfluences=4)
             self.skin_cluster = general.pynode(skin_cluster_name)
-            self.influence_list = self.__get_influence_list()
+            self.__bind_influences()
 
         if [joint.name() for joint in self.get_influence_objects()] != self.skin_info_dict.get("influence_names"):
             pm.skinCluster(self.mesh, unbind=True, edit=True)
             self.load_skin_from_file(filename, binary=binary)
 
-        self.set_weights(self.get_complete_weights_list())
+        self.set_weights(self.weights)
+        # the skinCluster might be a new one, the weights are already up to date
+        self.__bind_skin_cluster()
 
     def get_weight_list_of_vertex(self, vertex_number):
-        return self.skin_info_dict.get("weight_dict").get(str(vertex_number))
+        return self.weights[int(vertex_number)].tolist()
+
+    def get_weight_row_of_vertex(self, vertex_number):
+        # a view on the row in self.weights, so changing it changes the weights of this SkinInfo. It doesn't survive
+        # set_weights, that replaces self.weights
+        return self.weights[int(vertex_number)]
 
     def set_weights_list_of_vertex(self, vertex_number, weight_list):
-        self.skin_info_dict.get("weight_dict")[str(vertex_number)] = weight_list
+        self.weights[int(vertex_number)] = weight_list
 
     def get_vertices_influenced_by(self, joints, return_full_vertex_name=True, return_numbers=False):
         if not type(joints) == list:
@@ -761,75 +1033,63 @@ class SkinInfo(object):
         for joint in joints:
             joint_indices.append(self.get_index_of_joint(joint))
 
-        influenced_vertices = []
+        # one boolean mask over the columns of these joints instead of checking every vertex in Python
+        influenced_vertices = np.flatnonzero((self.weights[:, joint_indices] > 0).any(axis=1)).tolist()
 
-        if PY3:
-            iter_func = self.skin_info_dict.get("weight_dict").items
-        else:
-            iter_func = self.skin_info_dict.get("weight_dict").iteritems
-
-        for vertex, weights in iter_func():
-            for joint_index in joint_indices:
-                if weights[joint_index] > 0:
-                    influenced_vertices.append(int(vertex))
+        # asking for the numbers means the names don't need to be built at all
+        if return_numbers:
+            return influenced_vertices
 
         if return_full_vertex_name:
-            return ["%s.vtx[%s]" % (self.mesh.name(), number) for number in influenced_vertices]
+            return self.get_vertex_names(influenced_vertices)
 
-        if return_numbers:
-            return influenced_vertices
+    def get_vertex_names(self, vertex_numbers):
+        """
+        Turns vertex numbers into full vertex names, like "pCube1.vtx[3]"
+
+        :param vertex_numbers: <list> of <int>
+        :return: <list> of <string>
+        """
+        # looked up once instead of once per vertex, it's a call into Maya every time
+        mesh_name = self.mesh.name()
+        return ["%s.vtx[%s]" % (mesh_name, number) for number in vertex_numbers]
 
     def move_weights_to_other_joint(self, source_joints, target_joints, use_selected_components=False, by_current_weights=False):
         source_joints = source_joints if isinstance(source_joints, list) else [source_joints]
         target_joints = target_joints if isinstance(target_joints, list) else [target_joints]
 
         if use_selected_components:
-            influenced_vertices = general.flatten_selection_list(pm.polyListComponentConversion(pm.selected()[:-3], toVertex=True))
-            print(influenced_vertices)
+            selected_vertices = general.flatten_component_list(pm.polyListComponentConversion(pm.selected()[:-3], toVertex=True))
+            influenced_vertices = general.get_component_numbers(selected_vertices)
         else:
             influenced_vertices = self.get_vertices_influenced_by(source_joints, return_full_vertex_name=False, return_numbers=True)
 
+        # look all the indices up before touching the weights, adding a joint to the skinCluster reads them again
         target_indices = [self.get_index_of_joint(jnt) for jnt in target_joints]
+        source_indices = [self.get_index_of_joint(jnt) for jnt in source_joints]
 
-        for source_joint in source_joints:
-            source_index = self.get_index_of_joint(source_joint)
-
-            for vertex in influenced_vertices:
-                weights_list_for_this_vertex = self.get_weight_list_of_vertex(vertex)
-                weight_value_to_transfer = weights_list_for_this_vertex[source_index]
-                weights_list_for_this_vertex[source_index] = 0.0
-
-                if by_current_weights:
-                    # distribute weighting by using the current weights on the vertex
-
-                    weights = {}
-                    for target_index in target_indices:
-                        current_weight_on_target = weights_list_for_this_vertex[target_index]
-                        weights[target_index] = current_weight_on_target
+        rows = np.asarray(influenced_vertices, dtype=np.int64)
+        target_columns = np.ix_(rows, target_indices)
 
-                    weights_sum = sum(weights.values())
+        for source_index in source_indices:
+            weights_to_transfer = self.weights[rows, source_index]
+            self.weights[rows, source_index] = 0.0
 
-                    # this vertex has no skinning to the target joints, so setting this number to avoid divide by zero
-                    if weights_sum == 0:
-                        weights_sum = 1
+            if by_current_weights:
+                # distribute weighting by using the current weights on the vertex
+                current_target_weights = self.weights[target_columns]
+                weights_sum = current_target_weights.sum(axis=1, keepdims=True)
 
-                    normalized_weights = {vtx: weight / weights_sum for vtx, weight in weights.items()}
+                # these vertices have no skinning to the target joints, so setting this number to avoid divide by zero
+                weights_sum[weights_sum == 0] = 1
 
-                    # calculate a weighted value using normalized weighting
-                    for target_index, normalized_weight in normalized_weights.items():
-                        weight_to_add = weight_value_to_transfer * normalized_weight
-
-                        current_weight_on_target = weights_list_for_this_vertex[target_index]
-                        weights_list_for_this_vertex[target_index] = current_weight_on_target + weight_to_add
-
-                else:
-                    # alternate method here: evenly distribute weights across the target joints
-                    for target_index in target_indices:
-                        weight_to_add = weight_value_to_transfer / len(target_indices)
+                shares = current_target_weights / weights_sum
+            else:
+                # alternate method here: evenly distribute weights across the target joints
+                shares = np.full((len(rows), len(target_indices)), 1.0 / len(target_indices))
 
-                        current_weight_on_target = weights_list_for_this_vertex[target_index]
-                        weights_list_for_this_vertex[target_index] = current_weight_on_target + weight_to_add
+            self.weights[target_columns] += weights_to_transfer[:, np.newaxis] * shares
 
-        self.set_weights(self.get_complete_weights_list())
+        self.set_weights(self.weights)
 
 
@@ -1,34 +1,67 @@
-import os
-import base64
+import ctypes
+import io
+
+# pybase64 has the same interface as base64, but encodes and decodes with SIMD
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+import numpy as np
 
 import pymel.core as pm
 import maya.api.OpenMaya as newOM
 import maya.api.OpenMayaUI as newOMUI
-import tempfile
 
-from PySide6.QtWidgets import *
-from PySide6 import QtCore, QtGui
-from shiboken6 import wrapInstance
+# PySide6 from Maya 2025 on, PySide2 before that
+try:
+    from PySide6.QtWidgets import *
+    from PySide6 import QtCore, QtGui
+    from shiboken6 import wrapInstance, isValid
+except ImportError:
+    from PySide2.QtWidgets import *
+    from PySide2 import QtCore, QtGui
+    from shiboken2 import wrapInstance, isValid
 
 import sys
 if sys.version_info.major > 2:
     long = int
 
 
+_viewport_cache = {}
+
 def get_active_viewport(as_qt_object=False):
     """
     Returns the currently active viewport, or None
 
     :return:
     """
-    active_view = newOMUI.M3dView.active3dView()
-    view_widget = wrapInstance(long(active_view.widget()), QWidget)
+    widget_pointer = long(newOMUI.M3dView.active3dView().widget())
+
+    # wrapping the widget and making the ModelPanel only has to happen once per viewport
+    cached_viewport = _viewport_cache.get(widget_pointer)
+    if cached_viewport is None or not isValid(cached_viewport["widget"]):
+        # panels get torn down and rebuilt, forget the viewports whose widget is gone while we're at it
+        for pointer in [pointer for pointer, viewport in _viewport_cache.items() if not isValid(viewport["widget"])]:
+            del _viewport_cache[pointer]
+
+        cached_viewport = {"widget": wrapInstance(widget_pointer, QWidget), "panel_name": None, "model_panel": None}
+        _viewport_cache[widget_pointer] = cached_viewport
+
     if as_qt_object:
-        return view_widget
+        return cached_viewport["widget"]
+
+    # only made when someone asks for it, callers that want the Qt object never need pymel. The widget can end up in
+    # a different panel, so check the panel is still the one the ModelPanel was made for
+    panel_name = cached_viewport["widget"].parentWidget().objectName()
+    if cached_viewport["model_panel"] is None or cached_viewport["panel_name"] != panel_name:
+        cached_viewport["model_panel"] = pm.ui.ModelPanel(panel_name)
+        cached_viewport["panel_name"] = panel_name
+
+    return cached_viewport["model_panel"]
 
-    pw = view_widget.parentWidget()
-    return pm.ui.ModelPanel(pw.objectName())
 
+_status_line_cache = {"widget": None}
 
 def get_status_line():
     """
@@ -36,19 +69,114 @@ def get_status_line():
 
     :return:
     """
-    status_line = pm.windows.toQtObject("StatusLine|MainStatusLineLayout|formLayout4|flowLayout1")
+    status_line = _status_line_cache["widget"]
+    # the widget gets deleted when Maya rebuilds its UI, only then does it need to be looked up again
+    if status_line is None or not isValid(status_line):
+        status_line = pm.windows.toQtObject("StatusLine|MainStatusLineLayout|formLayout4|flowLayout1")
+        _status_line_cache["widget"] = status_line
+
     return status_line
 
 
+_capture_image = {"image": None, "size": (0, 0)}
+
+def _get_capture_image(width, height):
+    """
+    Returns an MImage of this size to read the viewport into. The same one is reused for as long as the size of the
+    viewport doesn't change, instead of allocating a new viewport sized image for every capture
+
+    :param width: <int>
+    :param height: <int>
+    :return: <MImage>
+    """
+    if _capture_image["image"] is None or _capture_image["size"] != (width, height):
+        image = newOM.MImage()
+        image.create(width, height)
+        _capture_image["image"] = image
+        _capture_image["size"] = (width, height)
+
+    return _capture_image["image"]
+
+
 def get_thumbnail_data(image_size=256):
     """
     Capture the current viewport as a jpeg image, and return the raw data from it.
 
+    :param image_size: <int> width and height of the thumbnail
+    :return: <string> the jpeg data, base64 encoded
+    """
+    return encode_thumbnail_data(get_thumbnail_data_raw(image_size))
+
+
+def get_thumbnail_data_raw(image_size=256):
+    """
+    Capture the current viewport as a jpeg image, and return the jpeg bytes without base64 encoding them. Use this when
+    the thumbnail stays in this process, like when it gets shown in a QPixmap or written to a binary file
+
+    :param image_size: <int> width and height of the thumbnail
+    :return: <bytes>
+    """
+    return _encode_thumbnail_image(_capture_viewport_square(image_size), image_size)
+
+
+def get_thumbnail_data_async(callback, image_size=256):
+    """
+    Capture the current viewport like get_thumbnail_data, but only the capture happens right away. Scaling, jpeg and
+    base64 encoding happen on a thread of the global QThreadPool, so the Maya UI doesn't wait for them. When the
+    thumbnail is done, callback gets called with it on the main thread
+
+    :param callback: function that takes the base64 encoded thumbnail data as its only argument
+    :param image_size: <int> width and height of the thumbnail
+    :return: None
+    """
+    # reading the viewport has to happen on the main thread, the rest doesn't
+    encoder = _ThumbnailEncoder(_capture_viewport_square(image_size), image_size)
+    encoder.signals.finished.connect(callback, QtCore.Qt.QueuedConnection)
+    encoder.signals.finished.connect(lambda *args: _running_thumbnail_encoders.discard(encoder),
+                                     QtCore.Qt.QueuedConnection)
+
+    # keep the encoder alive until it's done, nothing else holds on to it
+    _running_thumbnail_encoders.add(encoder)
+    QtCore.QThreadPool.globalInstance().start(encoder)
+
+
+class _ThumbnailSignals(QtCore.QObject):
+    finished = QtCore.Signal(str)
+
+
+class _ThumbnailEncoder(QtCore.QRunnable):
+    def __init__(self, q_img, image_size):
+        """
+        Scales, jpeg and base64 encodes a captured viewport on a worker thread, see get_thumbnail_data_async
+
+        :param q_img: <QImage> the square, captured viewport
+        :param image_size: <int> width and height of the thumbnail
+        """
+        super(_ThumbnailEncoder, self).__init__()
+        self.setAutoDelete(False)
+        self.q_img = q_img
+        self.image_size = image_size
+        # made on the main thread, so the finished signal gets delivered there
+        self.signals = _ThumbnailSignals()
+
+    def run(self):
+        self.signals.finished.emit(encode_thumbnail_data(_encode_thumbnail_image(self.q_img, self.image_size)))
+
+
+_running_thumbnail_encoders = set()
+
+
+def _capture_viewport_square(image_size):
+    """
+    Reads the active viewport and copies the square in the middle of it into a QImage, downsampled to about twice
+    image_size. This is the part of making a thumbnail that needs the main thread
+
+    :param image_size: <int> width and height of the thumbnail
+    :return: <QImage>
     """
     view = newOMUI.M3dView.active3dView()
 
-    image = newOM.MImage()
-    image.create(view.portWidth(), view.portHeight())
+    image = _get_capture_image(view.portWidth(), view.portHeight())
     view.pushViewport(
         0, 0,
         view.portWidth(), view.portHeight()
@@ -58,32 +186,107 @@ def get_thumbnail_data(image_size=256):
     view.readColorBuffer(image, True)
     view.popViewport()
 
-    temp_file_cls = tempfile.NamedTemporaryFile()
-    temp_file_path = "{}.jpeg".format(temp_file_cls.name)
-    image.writeToFile(temp_file_path, outputFormat="jpeg")
-
-    # crop to square
-    q_img = QtGui.QImage(temp_file_path)
-    crop_size = min(q_img.width(), q_img.height())
+    # crop to square, straight from the pixels of the MImage so only the square gets copied
+    width, height = image.getSize()
+    crop_size = min(width, height)
     cropped_rect = QtCore.QRect(
-        (q_img.width() - crop_size) / 2,
-        (q_img.height() - crop_size) / 2,
+        (width - crop_size) // 2,
+        (height - crop_size) // 2,
         crop_size,
         crop_size
     )
-    cropped_qimg = q_img.copy(cropped_rect)  # type: QtGui.QImage
-    cropped_qimg.scaled(image_size, image_size)
-    cropped_qimg.save(temp_file_path)
+    # skip pixels on big viewports, only keeping twice the thumbnail size for the smooth scale to work with
+    step = max(1, crop_size // (image_size * 2))
+    return mimage_to_qimage(image, cropped_rect, step)
+
+
+def _encode_thumbnail_image(cropped_qimg, image_size):
+    """
+    Scales the captured square down to the thumbnail size and encodes it as a jpeg. QImage doesn't need the main
+    thread, so this can run on a worker thread
+
+    :param cropped_qimg: <QImage> like _capture_viewport_square returns
+    :param image_size: <int> width and height of the thumbnail
+    :return: <bytes>
+    """
+    cropped_qimg = cropped_qimg.scaled(image_size, image_size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+    return qimage_to_jpeg_bytes(cropped_qimg)
+
 
-    # read image data
-    with open(temp_file_path, "rb") as fp:
-        thumbnail_data = fp.read()
+def mimage_to_qimage(image, rect=None, step=1):
+    """
+    Copies the pixels of an RGBA MImage into a QImage, without writing it to a file first
+
+    :param image: <MImage> with RGBA pixels, like readColorBuffer(image, True) gives you
+    :param rect: <QRect> only copy this part of the image. Measured from the top left, like in Qt
+    :param step: <int> only copy every step-th pixel in both directions, to make the image smaller without copying it
+    :return: <QImage>
+    """
+    width, height = image.getSize()
+    pixels = image.pixels()
+    # depending on the Maya version this is either the pixel data or the address of it
+    if not isinstance(pixels, (bytes, bytearray)):
+        pixels = (ctypes.c_ubyte * (width * height * 4)).from_address(pixels)
+
+    # a view on the pixels of the MImage, nothing gets copied yet. MImage rows go from the bottom up, so flip them
+    pixel_array = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4)[::-1]
+    if rect is not None:
+        pixel_array = pixel_array[rect.y():rect.y() + rect.height(), rect.x():rect.x() + rect.width()]
+    if step > 1:
+        pixel_array = pixel_array[::step, ::step]
+
+    # only the part that's needed gets copied, the QImage makes its own copy so it doesn't depend on the array
+    pixel_array = np.ascontiguousarray(pixel_array)
+    crop_height, crop_width = pixel_array.shape[:2]
+    return QtGui.QImage(pixel_array.data, crop_width, crop_height, crop_width * 4,
+                        QtGui.QImage.Format_RGBA8888).copy()
+
+
+_pil_image_module = {"module": None, "imported": False}
+
+def _get_pil_image():
+    """
+    Imports Pillow's Image module the first time a thumbnail gets encoded instead of when this module is imported, so
+    importing the package doesn't pay for it. Pillow's wheels come with libjpeg-turbo, which encodes jpegs a lot faster
+    than the libjpeg Qt might be built with
+
+    :return: the PIL.Image module, or None if Pillow isn't installed
+    """
+    if not _pil_image_module["imported"]:
+        try:
+            from PIL import Image
+            _pil_image_module["module"] = Image
+        except ImportError:
+            _pil_image_module["module"] = None
+        _pil_image_module["imported"] = True
+
+    return _pil_image_module["module"]
 
-    os.remove(temp_file_path)
 
-    thumbnail_data = encode_thumbnail_data(thumbnail_data)
+def qimage_to_jpeg_bytes(q_img):
+    """
+    Encodes a QImage as a jpeg in memory. Uses Pillow when it's installed, Qt's jpeg plugin otherwise
+
+    :param q_img: <QImage>
+    :return: <bytes>
+    """
+    PILImage = _get_pil_image()
+    if PILImage is not None:
+        rgb_img = q_img.convertToFormat(QtGui.QImage.Format_RGB888)
+        pil_image = PILImage.frombuffer("RGB", (rgb_img.width(), rgb_img.height()), bytes(rgb_img.constBits()),
+                                        "raw", "RGB", rgb_img.bytesPerLine(), 1)
+        jpeg_buffer = io.BytesIO()
+        pil_image.save(jpeg_buffer, "JPEG")
+        return jpeg_buffer.getvalue()
+
+    byte_array = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(byte_array)
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    q_img.save(buffer, "JPEG")
+    buffer.close()
 
-    return thumbnail_data
+    return bytes(byte_array)
 
 
 def encode_thumbnail_data(thumbnail_data):